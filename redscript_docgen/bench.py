@@ -0,0 +1,244 @@
+import json
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+import click
+
+from redscript_docgen.build import Builder
+from redscript_docgen.parser import PARSERS
+
+BENCH_VERSION = 1
+
+PRIMITIVES = ["Int32", "Uint64", "Float", "Bool", "String", "CName", "Vector4"]
+CONTAINERS = ["array", "ref", "wref", "script_ref"]
+ANNOTATIONS = ["@default({owner}, {value})", "@runtimeProperty(\"{owner}\", \"{value}\")"]
+FIELD_QUALIFIERS = ["public", "private", "protected", "native", "persistent", "edit", "const"]
+FUNC_QUALIFIERS = ["public", "private", "protected", "final", "static", "native", "cb", "const"]
+
+
+@dataclass
+class CorpusConfig:
+    files: int = 200
+    directories: int = 20
+    classes: int = 5
+    fields: int = 10
+    methods: int = 10
+    params: int = 3
+    enums: int = 1
+    enum_items: int = 8
+    functions: int = 2
+    annotations: int = 1
+    generic_depth: int = 3
+    body_lines: int = 20
+    seed: int = 0
+
+
+class CorpusGenerator:
+    # produces the same corpus for the same config, the syntax is limited
+    # to what every parser backend accepts
+    def __init__(self, config):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.class_names = []
+
+    def type_(self, depth=None):
+        depth = self.config.generic_depth if depth is None else depth
+        if depth > 0 and self.random.random() < 0.5:
+            container = self.random.choice(CONTAINERS)
+            if container in ("ref", "wref") and self.class_names:
+                return f"{container}<{self.random.choice(self.class_names)}>"
+            return f"{container}<{self.type_(depth - 1)}>"
+        return self.random.choice(PRIMITIVES)
+
+    def qualifiers(self, choices, count=2):
+        return " ".join(self.random.sample(choices, count))
+
+    def annotations(self, owner):
+        return "".join(
+            "  " + self.random.choice(ANNOTATIONS).format(owner=owner, value=i) + "\n"
+            for i in range(self.config.annotations))
+
+    def body(self, indent):
+        lines = []
+        for i in range(self.config.body_lines):
+            lines.append(
+                f'{indent}let x{i}: Int32 = {i}; '
+                f'if x{i} > {i % 7} {{ this.Log("{{x{i}}} /* }}"); }} // {i}')
+        return "\n".join(lines)
+
+    def func(self, name, indent, owner):
+        params = ", ".join(
+            f"{self.random.choice(['', 'opt ', 'out '])}p{i}: {self.type_()}"
+            for i in range(self.config.params))
+        return (
+            f"{self.annotations(owner) if indent else ''}"
+            f"{indent}{self.qualifiers(FUNC_QUALIFIERS)} func {name}({params}) -> {self.type_()} {{\n"
+            f"{self.body(indent + '  ')}\n"
+            f"{indent}}}\n")
+
+    def class_(self, name):
+        base = self.random.choice(self.class_names) if self.class_names else "IScriptable"
+        out = [f"public class {name} extends {base} {{\n"]
+        for i in range(self.config.fields):
+            out.append(self.annotations(name))
+            out.append(f"  {self.qualifiers(FIELD_QUALIFIERS)} let m_{name}{i}: {self.type_()};\n")
+        for i in range(self.config.methods):
+            out.append(self.func(f"Method{i}", "  ", name))
+        out.append("}\n")
+        self.class_names.append(name)
+        return "".join(out)
+
+    def enum(self, name):
+        items = ",\n".join(f"  {name}Item{i} = {i - 1}" for i in range(self.config.enum_items))
+        return f"enum {name} {{\n{items}\n}}\n"
+
+    def source(self, index):
+        out = []
+        for i in range(self.config.classes):
+            out.append(self.class_(f"C{index}x{i}"))
+        for i in range(self.config.enums):
+            out.append(self.enum(f"E{index}x{i}"))
+        for i in range(self.config.functions):
+            out.append(self.func(f"Global{index}x{i}", "", None))
+        return "".join(out)
+
+    def write(self, directory):
+        # corpus.json records the config, benchmark results include it
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "corpus.json").write_text(
+            json.dumps(asdict(self.config), indent=2, sort_keys=True) + "\n", encoding="UTF-8")
+        for index in range(self.config.files):
+            path = directory / f"d{index % self.config.directories}" / f"f{index}.script"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(self.source(index), encoding="UTF-8")
+
+
+def git_revision():
+    # the revision of this checkout, wherever the benchmark is started from
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def corpus_config(directory):
+    try:
+        return json.loads((directory / "corpus.json").read_text(encoding="UTF-8"))
+    except FileNotFoundError:
+        return None
+
+
+def timed(phases, name, function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    phases.setdefault(name, []).append(time.perf_counter() - start)
+    return result
+
+
+def run_once(directory, phases, mode, parser, jobs):
+    # every run starts without caches, the warm parse reuses the cold
+    # run's parse cache in a new builder
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_path = Path(output_dir)
+        builder = Builder(directory, output_path, "", mode, parser, jobs)
+        files = timed(phases, "discover", builder.discover)
+        timed(phases, "parse_cold", builder.parse, files, jobs)
+        builder.close()
+
+        builder = Builder(directory, output_path, "", mode, parser, jobs)
+        _, cache_stats = timed(phases, "parse_warm", builder.parse, files, jobs)
+        timed(phases, "index", builder.index)
+        timed(phases, "render", builder.render, True, jobs)
+        builder.close()
+        return len(files), len(builder.namespace_root.forward_map), cache_stats
+
+
+def run_benchmark(directory, repeat=3, mode="html", parser="descent", jobs=None):
+    directory = Path(directory)
+    phases = {}
+    for _ in range(repeat):
+        files, pages, cache_stats = run_once(directory, phases, mode, parser, jobs)
+    return {
+        "version": BENCH_VERSION,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"mode": mode, "parser": parser, "jobs": jobs, "repeat": repeat},
+        "corpus": {
+            "files": files,
+            "bytes": sum(it.stat().st_size for it in directory.glob("**/*.script")),
+            "pages": pages,
+            "warm_cache_hits": cache_stats["hit"],
+            "config": corpus_config(directory),
+        },
+        "phases": {
+            name: {
+                "min": min(times),
+                "median": statistics.median(times),
+                "runs": times,
+            }
+            for name, times in phases.items()
+        },
+    }
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command()
+@click.argument("directory")
+@click.option("--files", type=int, default=CorpusConfig.files)
+@click.option("--directories", type=int, default=CorpusConfig.directories)
+@click.option("--classes", type=int, default=CorpusConfig.classes, help="Classes per file.")
+@click.option("--fields", type=int, default=CorpusConfig.fields, help="Fields per class.")
+@click.option("--methods", type=int, default=CorpusConfig.methods, help="Methods per class.")
+@click.option("--params", type=int, default=CorpusConfig.params, help="Parameters per function.")
+@click.option("--enums", type=int, default=CorpusConfig.enums, help="Enums per file.")
+@click.option("--enum-items", type=int, default=CorpusConfig.enum_items)
+@click.option("--functions", type=int, default=CorpusConfig.functions,
+              help="Global functions per file.")
+@click.option("--annotations", type=int, default=CorpusConfig.annotations,
+              help="Annotations per member.")
+@click.option("--generic-depth", type=int, default=CorpusConfig.generic_depth)
+@click.option("--body-lines", type=int, default=CorpusConfig.body_lines,
+              help="Statements per function body.")
+@click.option("--seed", type=int, default=CorpusConfig.seed)
+def generate(directory, **options):
+    """Write a deterministic synthetic corpus to DIRECTORY."""
+    CorpusGenerator(CorpusConfig(**options)).write(directory)
+
+
+@cli.command()
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default=None,
+              help="Write the results as JSON to this file instead of stdout.")
+@click.option("--repeat", type=click.IntRange(min=1), default=3)
+@click.option("--mode", type=click.Choice(["html", "rst", "md"]), default="html")
+@click.option("--parser", type=click.Choice(sorted(PARSERS)), default="descent")
+@click.option("--jobs", "-j", type=click.IntRange(min=0), default=None)
+def run(directory, output, repeat, mode, parser, jobs):
+    """Time discovery, parsing, indexing and rendering of DIRECTORY."""
+    result = run_benchmark(directory, repeat, mode, parser, jobs)
+    text = json.dumps(result, indent=2, sort_keys=True)
+    if output is None:
+        click.echo(text)
+    else:
+        Path(output).write_text(text + "\n", encoding="UTF-8")
+    for name, phase in result["phases"].items():
+        click.echo(f"{name:>12}: {phase['min']:.3f}s", err=True)
+
+
+if __name__ == '__main__':
+    cli()
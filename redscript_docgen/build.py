@@ -0,0 +1,609 @@
+import logging
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures.process import ProcessPoolExecutor
+from concurrent.futures.thread import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from redscript_docgen.cache import ParseCache, ParseResult, HIT, MISS, STALE, read_source
+from redscript_docgen.compress import SUFFIXES, sibling, sync_compressed
+from redscript_docgen.export import source_lines, symbol_records, write_index
+from redscript_docgen.hierarchy import DEPENDENCY_PREFIX
+from redscript_docgen.incremental import LinkRecorder, PageGraph, page_key, render_stamp
+from redscript_docgen.pages import definition_page, split_pages, write_nav
+from redscript_docgen.parser import parse, parser_version
+from redscript_docgen.parser.prescan import rebase, span_digest, split_declarations
+from redscript_docgen.profiling import NullProfiler
+from redscript_docgen.render import PageRenderer, PageWriter, render_pages, \
+    DEFAULT_FLUSH_SIZE
+from redscript_docgen.search import copy_static, write_search_index
+from redscript_docgen.store import DefinitionStore, CLASS_TYPES, ENUM_TYPES, FIELD_TYPES, \
+    FUNC_TYPES
+from redscript_docgen.symbols import SymbolTable
+from redscript_docgen.template_env import build_indexes, init_env
+
+log = logging.getLogger()
+
+# pending parse cache entries are written out in batches of this many in the
+# low memory mode
+CACHE_FLUSH_SIZE = 256
+# changed files the prescan mode reads and parses together
+PRESCAN_BATCH = 64
+
+
+class Namespace:
+    def __init__(self, name):
+        self.name = name
+        self.forward_map = defaultdict(list)
+        self.reverse_map = {}
+        # see pages.split_pages
+        self.stubs = {}
+        self.pages = {}
+
+    def add_definition(self, definition):
+        parts = definition.file_path.parent.parts
+        self.forward_map[parts].append(definition)
+        self.reverse_map[definition.name] = definition
+        if hasattr(definition, "members"):
+            for member in definition.members:
+                self.reverse_map[definition.name, member.name] = member
+
+    def clear(self):
+        self.forward_map.clear()
+        self.reverse_map.clear()
+        self.stubs = {}
+        self.pages = {}
+
+    def __contains__(self, item):
+        return item in self.reverse_map
+
+    def __getitem__(self, item):
+        return self.reverse_map[item]
+
+
+def definition_name_sort(definition):
+    if isinstance(definition, ENUM_TYPES):
+        return 1, definition.name
+    if isinstance(definition, CLASS_TYPES):
+        return 2, definition.name
+    if isinstance(definition, FUNC_TYPES):
+        return 1, definition.name
+    if isinstance(definition, FIELD_TYPES):
+        return 1, definition.name
+
+
+def definition_sort_key(definition):
+    # definitions with the same name are ordered by where they are defined,
+    # so a page does not depend on the order its sources were parsed in
+    return (*definition_name_sort(definition), definition.file_path.as_posix(),
+            definition.line_pos)
+
+
+def load_parse_source(cache, parser, file_arg):
+    abs_path, rel_path = file_arg
+    status, key, definitions, source = cache.load(abs_path, rel_path)
+    if status == HIT:
+        return ParseResult(rel_path, status, key, definitions, digest=key and key.digest)
+
+    try:
+        log.debug(f"parsing: {abs_path}")
+        start = time.perf_counter()
+        definitions = parse(read_source(source), rel_path, parser)
+        return ParseResult(rel_path, status, key, definitions, time.perf_counter() - start,
+                           key.digest)
+    except Exception as e:
+        log.error("processing: %s failed: %s", abs_path.as_uri(), e)
+        return ParseResult(rel_path, status, None, [], digest=key.digest)
+
+
+def parse_files(files, cache, parser, jobs=None):
+    load = partial(load_parse_source, cache, parser)
+    if jobs is None:
+        with ThreadPoolExecutor() as executor:
+            yield from executor.map(load, files)
+        return
+
+    # parsing is CPU bound, so processes are needed to use more than one
+    # core; files are sent in chunks to keep the IPC overhead per file low
+    jobs = jobs or os.cpu_count()
+    chunksize = max(1, min(64, len(files) // (jobs * 4)))
+    with ProcessPoolExecutor(jobs) as executor:
+        yield from executor.map(load, files, chunksize=chunksize)
+
+
+def parse_span(parser, span):
+    # returns (definitions, error, elapsed) of a declaration parsed on its own
+    start = time.perf_counter()
+    try:
+        return parse(span, None, parser), None, time.perf_counter() - start
+    except Exception as e:
+        return None, str(e), time.perf_counter() - start
+
+
+class SpanFile:
+    # a changed file in the prescan mode, spans are [start, digest,
+    # definitions] with definitions None until parsed
+    def __init__(self, abs_path, rel_path, status, key, text):
+        self.abs_path = abs_path
+        self.rel_path = rel_path
+        self.status = status
+        self.key = key
+        self.text = text
+        self.spans = []
+        self.failed = False
+        self.elapsed = 0.0
+
+    def parsed(self, span, definitions, error, elapsed):
+        start = span[0]
+        self.elapsed += elapsed
+        if error is not None:
+            self.failed = True
+            log.error("processing: %s failed at line %s: %s", self.abs_path.as_uri(),
+                      self.text.count("\n", 0, start) + 1, error)
+        span[2] = definitions
+
+    def result(self):
+        definitions = []
+        for start, _, span_definitions in self.spans:
+            if span_definitions is not None:
+                definitions.extend(rebase(span_definitions, self.rel_path, start))
+        # files with errors are not cached as a whole, so the errors are
+        # reported again, their good declarations are in the span cache
+        key = None if self.failed else self.key
+        return ParseResult(self.rel_path, self.status, key, definitions, self.elapsed,
+                           self.key.digest)
+
+
+def parse_files_prescan(files, cache, parser, jobs=None):
+    # changed files are split into top-level declarations that are looked
+    # up in the span cache by the digest of their text, only the missing
+    # declarations are parsed; with jobs set they are spread over worker
+    # processes independent of the file they are in; changed files are read
+    # and parsed PRESCAN_BATCH at a time, so only their texts are held
+    workers = None if jobs is None else jobs or os.cpu_count()
+    load = partial(parse_span, parser)
+    executors = []
+
+    def parse_batch(results, tasks):
+        spans = [span_file.text[span[0]:end] for span_file, span, end in tasks]
+        if workers is None or len(tasks) < 2:
+            parsed = map(load, spans)
+        else:
+            if not executors:
+                executors.append(ProcessPoolExecutor(workers))
+            chunksize = max(1, min(256, len(tasks) // (workers * 4)))
+            parsed = executors[0].map(load, spans, chunksize=chunksize)
+        for (span_file, span, _), (definitions, error, elapsed) in zip(tasks, parsed):
+            if error is None:
+                # stored before rebase, relative to the span and without a path
+                cache.store_span(span[1], definitions)
+            span_file.parsed(span, definitions, error, elapsed)
+        return [result.result() if isinstance(result, SpanFile) else result for result in results]
+
+    results = []
+    tasks = []
+    changed = 0
+    try:
+        for abs_path, rel_path in files:
+            status, key, definitions, source = cache.load(abs_path, rel_path)
+            if status == HIT:
+                result = ParseResult(rel_path, status, key, definitions, digest=key and key.digest)
+                if results:
+                    results.append(result)
+                else:
+                    yield result
+                continue
+            log.debug(f"parsing: {abs_path}")
+            span_file = SpanFile(abs_path, rel_path, status, key, read_source(source))
+            for start, end in split_declarations(span_file.text):
+                digest = span_digest(span_file.text[start:end])
+                span = [start, digest, cache.load_span(digest)]
+                span_file.spans.append(span)
+                if span[2] is None:
+                    tasks.append((span_file, span, end))
+            cache.store_span_files(rel_path, [span[1] for span in span_file.spans])
+            results.append(span_file)
+            changed += 1
+            if changed == PRESCAN_BATCH:
+                yield from parse_batch(results, tasks)
+                results, tasks, changed = [], [], 0
+        yield from parse_batch(results, tasks)
+    finally:
+        for executor in executors:
+            executor.shutdown()
+
+
+class Builder:
+    # holds the parsed sources, the index and the template environment
+    # between builds, so that updates only redo the work that changed
+    def __init__(self, directory, output_path, base_uri, mode, parser, jobs=None,
+                 compiled_templates=None, compact=False, flush_size=DEFAULT_FLUSH_SIZE,
+                 profiler=None, low_memory=False, prescan=False, minify=False,
+                 precompress=False, page_budget=None, emit_index=None):
+        self.directory = directory
+        self.output_path = output_path
+        self.base_uri = base_uri
+        self.mode = mode
+        self.parser = parser
+        self.jobs = jobs
+        self.flush_size = flush_size
+        # whitespace is only insignificant in html
+        self.minify = minify and mode == "html"
+        # namespaces with more definitions and class members are split into
+        # several pages, only html has the stub template
+        self.page_budget = page_budget if mode == "html" else None
+        self.precompress = precompress
+        # the symbol index for other tools is written next to this path
+        self.emit_index = emit_index
+        self.prescan = prescan
+        self.profiler = profiler or NullProfiler()
+        cache_path = output_path / "__cache__"
+        self.env_options = {
+            "mode": mode,
+            "base_uri": base_uri,
+            "cache_path": cache_path / "jinja",
+            "compiled_path": compiled_templates,
+        }
+        # the low memory mode keeps only a symbol table between the two
+        # passes, page definitions are loaded again one page at a time
+        self.low_memory = low_memory
+        self.namespace_root = SymbolTable("global") if low_memory else Namespace("global")
+        # the definitions of the sources that failed to parse, by posix path;
+        # the second pass uses them instead of parsing and logging again
+        self.failed_sources = {}
+        self.recorder = LinkRecorder()
+        self.env, self.mode_ext = init_env(
+            namespace=self.namespace_root, recorder=self.recorder, **self.env_options)
+        self.cache = ParseCache(cache_path / "parse.sqlite", parser_version(parser))
+        self.graph = PageGraph(cache_path / "pages.sqlite",
+                               render_stamp(mode, base_uri, compiled_templates, self.minify,
+                                            self.page_budget))
+        self.sources = {}
+        # content digest of every source by its posix path, see
+        # PageGraph.is_current
+        self.source_digests = {}
+        # (digest, source_lines) of every source in the last symbol index,
+        # so updates only read the sources that changed
+        self.source_lines = {}
+        # counts of the last render, see render()
+        self.page_stats = {"written": 0, "unchanged": 0, "deleted": 0}
+        # with compact set, sources hold views into a DefinitionStore
+        # instead of the parsed objects
+        self.store = DefinitionStore() if compact else None
+
+    def discover(self):
+        return [
+            (it, it.relative_to(self.directory))
+            for it in sorted(self.directory.glob("**/*.script"))
+            if it.is_file()
+        ]
+
+    def parse_files(self, files, jobs=None):
+        if self.prescan:
+            return parse_files_prescan(files, self.cache, self.parser, jobs)
+        return parse_files(files, self.cache, self.parser, jobs)
+
+    def parse(self, files, jobs=None):
+        cache_stats = Counter({HIT: 0, MISS: 0, STALE: 0})
+        changed_sources = set()
+        unknown = []
+        for result in self.parse_files(files, jobs):
+            cache_stats[result.status] += 1
+            if result.digest is None:
+                unknown.append(result.rel_path.as_posix())
+            else:
+                self.source_digests[result.rel_path.as_posix()] = result.digest
+            if result.status != HIT:
+                changed_sources.add(result.rel_path.as_posix())
+                self.profiler.file(result.rel_path.as_posix(), result.elapsed, result.definitions)
+            if result.key is not None:
+                self.cache.store(result.rel_path, result.key, result.definitions)
+            if self.low_memory:
+                if result.status != HIT and result.key is None:
+                    self.failed_sources[result.rel_path.as_posix()] = result.definitions
+                else:
+                    self.failed_sources.pop(result.rel_path.as_posix(), None)
+                self.namespace_root.add_definitions(result.definitions)
+                if len(self.cache.pending) >= CACHE_FLUSH_SIZE:
+                    self.cache.flush()
+                continue
+            definitions = result.definitions
+            if self.store is not None:
+                if result.status == HIT and result.rel_path in self.sources:
+                    continue
+                definitions = self.store.add_all(definitions)
+            self.sources[result.rel_path] = definitions
+        self.cache.flush()
+        if unknown:
+            digests = self.cache.digests()
+            for rel_path in unknown:
+                self.source_digests[rel_path] = digests.get(rel_path)
+        return changed_sources, cache_stats
+
+    def compact_store(self):
+        # the store only grows, once updates left more dead definitions
+        # than live ones it is rebuilt from the live views
+        live = sum(len(it) for it in self.sources.values())
+        if self.store.definitions <= 2 * live:
+            return
+        store = DefinitionStore()
+        self.sources = {
+            rel_path: store.add_all(definitions)
+            for rel_path, definitions in self.sources.items()
+        }
+        self.store = store
+
+    def split_pages(self, page_map):
+        namespace_root = self.namespace_root
+        namespace_root.stubs, namespace_root.pages = {}, {}
+        if self.page_budget is not None:
+            namespace_root.stubs, namespace_root.pages = split_pages(page_map, self.page_budget)
+
+    def index(self):
+        if self.low_memory:
+            self.split_pages(self.namespace_root.symbol_map)
+            build_indexes(self.env)
+            return
+        if self.store is not None:
+            self.compact_store()
+        self.namespace_root.clear()
+        for rel_path in sorted(self.sources):
+            for definition in self.sources[rel_path]:
+                self.namespace_root.add_definition(definition)
+        for definitions in self.namespace_root.forward_map.values():
+            definitions.sort(key=definition_sort_key)
+        self.split_pages(self.namespace_root.forward_map)
+        build_indexes(self.env)
+
+    def page_href(self, namespace):
+        # relative to the output path, for the manifests
+        return self.page_path(namespace).relative_to(self.output_path).as_posix()
+
+    def page_namespace(self, page):
+        # the inverse of page_key
+        return tuple(page.split("/")) if page else ()
+
+    def page_path(self, namespace):
+        if namespace:
+            return self.output_path / Path(*namespace[:-1], namespace[-1] + self.mode_ext)
+        return self.output_path / ("global" + self.mode_ext)
+
+    def resolve(self, name):
+        # the current value of a dependency a page recorded while rendering
+        if name.startswith(DEPENDENCY_PREFIX):
+            return self.env.globals["hierarchy"].fingerprint(name[len(DEPENDENCY_PREFIX):])
+        return self.env.globals["link_table"].target(name)
+
+    def page_sources(self):
+        # the source files of the definitions on every page, the stub of a
+        # split namespace depends on the sources of all its parts
+        if self.low_memory:
+            page_sources = self.namespace_root.page_sources()
+        else:
+            page_sources = {
+                namespace: tuple(sorted({it.file_path.as_posix() for it in definition_group}))
+                for namespace, definition_group in self.namespace_root.forward_map.items()
+            }
+        for namespace, parts in self.namespace_root.stubs.items():
+            page_sources[namespace] = tuple(sorted({
+                source for page, _, _ in parts for source in page_sources[page]}))
+        return page_sources
+
+    def page_digests(self, sources):
+        return tuple(self.source_digests.get(it) for it in sources)
+
+    def render_one_by_one(self, renderer, writer, pages, pending):
+        # the second pass of the low memory mode: the definitions of a page
+        # are loaded from the parse cache, rendered and dropped again
+        forward_map = self.namespace_root.forward_map
+        stubs, pages_of = self.namespace_root.stubs, self.namespace_root.pages
+        failed = self.failed_sources
+        for page in pages:
+            namespace = page[0]
+            if namespace not in stubs:
+                files = [
+                    (self.directory / it, Path(it)) for it in pending[namespace]
+                    if it not in failed
+                ]
+                definitions = [
+                    definition
+                    for result in self.parse_files(files)
+                    for definition in result.definitions
+                ]
+                for it in pending[namespace]:
+                    definitions.extend(failed.get(it, ()))
+                # the files of a part also hold the definitions of other parts
+                forward_map[namespace] = sorted((
+                    it for it in definitions if definition_page(pages_of, it) == namespace
+                ), key=definition_sort_key)
+            yield from render_pages(renderer, writer, [page])
+            forward_map.clear()
+
+    def render(self, force=False, jobs=None):
+        graph = self.graph
+        page_sources = self.page_sources()
+        pending = {}
+        for namespace, sources in page_sources.items():
+            definition_output_path = self.page_path(namespace)
+            page = page_key(namespace)
+            if not force and definition_output_path.exists() and graph.is_current(
+                    page, sources, self.page_digests(sources), self.resolve):
+                continue
+            pending[namespace] = sources
+
+        renderer = PageRenderer(self.namespace_root, self.env_options, self.env, self.recorder,
+                                self.flush_size, self.minify)
+        writer = PageWriter()
+        # forced builds compare with the pages on disk instead of the digests
+        # of the last build
+        pages = [
+            (namespace, self.page_path(namespace),
+             None if force else graph.digest(page_key(namespace)))
+            for namespace in pending
+        ]
+        if self.low_memory:
+            results = self.render_one_by_one(renderer, writer, pages, pending)
+        else:
+            results = render_pages(renderer, writer, pages, jobs)
+        rendered = []
+        try:
+            for namespace, links, elapsed in results:
+                rendered.append((namespace, links))
+                self.profiler.page(page_key(namespace), elapsed)
+        finally:
+            writer.close()
+            self.profiler.add("write", writer.busy, writer.cpu)
+        written = 0
+        for namespace, links in rendered:
+            digest, changed = writer.results[self.page_path(namespace)]
+            graph.update(page_key(namespace), pending[namespace], links, digest,
+                         self.page_digests(pending[namespace]))
+            written += changed
+        removed = graph.retain(page_key(it) for it in page_sources)
+        for page in removed:
+            self.delete_page(self.page_namespace(page))
+        graph.flush()
+        self.page_stats = {
+            "written": written,
+            "unchanged": len(page_sources) - written,
+            "deleted": len(removed),
+        }
+        return len(pending)
+
+    def delete_page(self, namespace):
+        # removes the page of a namespace that no longer has definitions and
+        # the directories that are left empty
+        path = self.page_path(namespace)
+        path.unlink(missing_ok=True)
+        for suffix in SUFFIXES:
+            sibling(path, suffix).unlink(missing_ok=True)
+        for parent in path.parents:
+            if parent == self.output_path or not parent.is_dir() or any(parent.iterdir()):
+                break
+            parent.rmdir()
+
+    def write_search(self):
+        # the search index and its script only exist for html output
+        if self.mode != "html":
+            return
+        copy_static(self.mode, self.output_path)
+        forward_map = self.namespace_root.forward_map
+        if self.low_memory:
+            forward_map = self.namespace_root.symbol_map
+        manifest = write_search_index(self.output_path, forward_map, self.page_href)
+        log.info("search index: %s symbols in %s shards",
+                 manifest["count"], len(manifest["shards"]))
+
+    def write_nav(self):
+        # the navigation manifest the sidebar of html pages loads
+        if self.mode != "html":
+            return
+        write_nav(self.output_path, self.page_sources(), self.namespace_root.stubs,
+                  self.page_href)
+
+    def source_definitions(self):
+        # (rel_path, definitions) of every source in path order, the low
+        # memory mode loads them from the parse cache again
+        if self.low_memory:
+            for result in self.parse_files(self.discover()):
+                yield result.rel_path, result.definitions
+            return
+        for rel_path in sorted(self.sources):
+            yield rel_path, self.sources[rel_path]
+
+    def write_index(self):
+        if self.emit_index is None:
+            return
+        lines = {}
+
+        def source_lines_of(rel_path):
+            digest = self.source_digests.get(rel_path.as_posix())
+            cached = self.source_lines.get(rel_path)
+            if cached is None or digest is None or cached[0] != digest:
+                cached = digest, source_lines(self.directory / rel_path)
+            lines[rel_path] = cached
+            return cached[1]
+
+        count = write_index(
+            self.emit_index, symbol_records(self.source_definitions(), source_lines_of))
+        self.source_lines = lines
+        log.info("symbol index: %s records", count)
+
+    def compress(self, jobs=None):
+        # runs without --precompress as well, to remove siblings that no
+        # longer match their page
+        compressed, removed = sync_compressed(self.output_path, self.precompress, jobs)
+        if compressed or removed:
+            log.info("precompressed %s files, removed %s stale siblings", compressed, removed)
+
+    def build(self, force=False):
+        profiler = self.profiler
+        with profiler.phase("discover"):
+            files = self.discover()
+        log.info("found %s files to process", len(files))
+        with profiler.phase("parse"):
+            _, cache_stats = self.parse(files, self.jobs)
+            removed = self.cache.retain(rel_path.as_posix() for _, rel_path in files)
+        log.info("finished parsing")
+        with profiler.phase("index"):
+            self.index()
+        with profiler.phase("render"):
+            rendered = self.render(force, self.jobs)
+        with profiler.phase("write"):
+            self.write_search()
+            self.write_nav()
+            self.write_index()
+        with profiler.phase("compress"):
+            self.compress(self.jobs)
+        log.info("parse cache: %(hit)s hits, %(miss)s misses, %(stale)s stale, "
+                 "%(removed)s removed", {**cache_stats, "removed": removed})
+        log.info("rendered %s of %s pages", rendered, len(self.page_sources()))
+        log.info("pages: %(written)s written, %(unchanged)s unchanged, %(deleted)s deleted",
+                 self.page_stats)
+
+    def reparse(self, paths):
+        # paths are changed, added or removed files or directories; returns
+        # the changed sources, the index is not updated
+        files = []
+        removed = set()
+        for path in sorted(paths):
+            if path.is_dir():
+                files.extend(
+                    (it, it.relative_to(self.directory))
+                    for it in sorted(path.glob("**/*.script")) if it.is_file())
+            elif path.is_file():
+                files.append((path, path.relative_to(self.directory)))
+            else:
+                rel_path = path.relative_to(self.directory)
+                for it in list(self.sources):
+                    if it == rel_path or rel_path in it.parents:
+                        del self.sources[it]
+                        self.source_digests.pop(it.as_posix(), None)
+                        removed.add(it.as_posix())
+        added = {
+            rel_path.as_posix()
+            for _, rel_path in files if rel_path not in self.sources
+        }
+        changed_sources, _ = self.parse(files)
+        return changed_sources | added | removed
+
+    def update(self, paths):
+        changed_sources = self.reparse(paths)
+        if not changed_sources:
+            return 0
+        self.index()
+        rendered = self.render()
+        self.write_search()
+        self.write_nav()
+        self.write_index()
+        self.compress()
+        log.info("%s sources changed, rendered %s pages", len(changed_sources), rendered)
+        log.info("pages: %(written)s written, %(unchanged)s unchanged, %(deleted)s deleted",
+                 self.page_stats)
+        return rendered
+
+    def close(self):
+        self.cache.close()
+        self.graph.close()
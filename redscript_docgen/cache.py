@@ -0,0 +1,179 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from collections import namedtuple
+
+HIT = "hit"
+MISS = "miss"
+STALE = "stale"
+
+CacheKey = namedtuple("CacheKey", ["size", "mtime_ns", "digest"])
+# elapsed is the parse time in seconds, 0 for cache hits; digest is the
+# content digest of the source, None for hits whose key did not change,
+# see ParseCache.digests
+ParseResult = namedtuple(
+    "ParseResult", ["rel_path", "status", "key", "definitions", "elapsed", "digest"],
+    defaults=(0.0, None))
+
+MMAP_SIZE = 1 << 30
+
+# one connection per process, thread and cache file, shared by every
+# ParseCache that is unpickled into a worker; kept here instead of in
+# thread locals so that close() reaches the connections of every thread
+connections = {}
+connections_lock = threading.Lock()
+
+
+def read_source(source):
+    # same newline handling as opening the file in text mode
+    return source.decode("UTF-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def connect(path):
+    # a connection is only used by the thread that opened it, but closed by
+    # the thread that closes the cache; the default rollback journal is
+    # kept, WAL needs shared memory that network file systems lack
+    db = sqlite3.connect(str(path), check_same_thread=False)
+    db.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS entries (
+            path TEXT PRIMARY KEY,
+            stamp TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            digest TEXT NOT NULL,
+            definitions BLOB NOT NULL
+        )""")
+    # definitions of single declarations by the digest of their text, see
+    # parser.prescan
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS spans (
+            digest TEXT PRIMARY KEY,
+            stamp TEXT NOT NULL,
+            definitions BLOB NOT NULL
+        )""")
+    # the spans every prescanned source was split into, see retain()
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS span_files (
+            path TEXT NOT NULL,
+            digest TEXT NOT NULL,
+            PRIMARY KEY (path, digest)
+        )""")
+    return db
+
+
+class ParseCache:
+    def __init__(self, path, stamp):
+        self.path = path
+        self.stamp = stamp
+        self.pending = []
+        self.pending_spans = []
+        self.pending_span_files = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db.commit()
+
+    def __getstate__(self):
+        return {"path": self.path, "stamp": self.stamp, "pending": [], "pending_spans": [],
+                "pending_span_files": {}}
+
+    @property
+    def db(self):
+        key = os.getpid(), threading.get_ident(), self.path
+        db = connections.get(key)
+        if db is None:
+            db = connect(self.path)
+            with connections_lock:
+                connections[key] = db
+        return db
+
+    # returns (status, key, definitions, source), key is None if the entry
+    # is up to date and the source is only read when mtime and size differ
+    def load(self, abs_path, rel_path):
+        stat = abs_path.stat()
+        row = self.db.execute(
+            "SELECT stamp, size, mtime_ns, digest, definitions"
+            " FROM entries WHERE path = ?",
+            (rel_path.as_posix(), )).fetchone()
+        if row is not None and row[0] == self.stamp \
+                and row[1] == stat.st_size and row[2] == stat.st_mtime_ns:
+            return HIT, None, pickle.loads(row[4]), None
+
+        source = abs_path.read_bytes()
+        key = CacheKey(stat.st_size, stat.st_mtime_ns,
+                       hashlib.sha1(source).hexdigest())
+        if row is None:
+            return MISS, key, None, source
+        if row[0] == self.stamp and row[3] == key.digest:
+            # touched but not changed, refresh the stored key
+            return HIT, key, pickle.loads(row[4]), source
+        return STALE, key, None, source
+
+    def digests(self):
+        # the content digest of every entry that is up to date
+        return dict(self.db.execute(
+            "SELECT path, digest FROM entries WHERE stamp = ?", (self.stamp, )))
+
+    def store(self, rel_path, key, definitions):
+        self.pending.append((
+            rel_path.as_posix(), self.stamp, key.size, key.mtime_ns, key.digest,
+            pickle.dumps(definitions, pickle.HIGHEST_PROTOCOL)))
+
+    def load_span(self, digest):
+        row = self.db.execute(
+            "SELECT stamp, definitions FROM spans WHERE digest = ?", (digest, )).fetchone()
+        if row is not None and row[0] == self.stamp:
+            return pickle.loads(row[1])
+        return None
+
+    def store_span(self, digest, definitions):
+        self.pending_spans.append((
+            digest, self.stamp, pickle.dumps(definitions, pickle.HIGHEST_PROTOCOL)))
+
+    def store_span_files(self, rel_path, digests):
+        self.pending_span_files[rel_path.as_posix()] = digests
+
+    def flush(self):
+        with self.db:
+            for path, digests in self.pending_span_files.items():
+                self.db.execute("DELETE FROM span_files WHERE path = ?", (path, ))
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO span_files VALUES (?, ?)",
+                    [(path, digest) for digest in digests])
+            self.db.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                self.pending)
+            self.db.executemany(
+                "INSERT OR REPLACE INTO spans VALUES (?, ?, ?)",
+                self.pending_spans)
+        self.pending.clear()
+        self.pending_spans.clear()
+        self.pending_span_files.clear()
+
+    def retain(self, paths):
+        # drops the entries of sources that are gone and the spans that no
+        # source was split into or that an older parser wrote; returns the
+        # number of dropped entries
+        self.flush()
+        db = self.db
+        with db:
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS live (path TEXT PRIMARY KEY)")
+            db.execute("DELETE FROM live")
+            db.executemany("INSERT OR IGNORE INTO live VALUES (?)", [(it, ) for it in paths])
+            removed = db.execute(
+                "DELETE FROM entries WHERE path NOT IN (SELECT path FROM live)").rowcount
+            db.execute("DELETE FROM span_files WHERE path NOT IN (SELECT path FROM live)")
+            db.execute(
+                "DELETE FROM spans WHERE stamp != ?"
+                " OR digest NOT IN (SELECT digest FROM span_files)", (self.stamp, ))
+        return removed
+
+    def close(self):
+        self.flush()
+        pid = os.getpid()
+        with connections_lock:
+            keys = [it for it in connections if it[0] == pid and it[2] == self.path]
+            dbs = [connections.pop(it) for it in keys]
+        for db in dbs:
+            db.close()
@@ -0,0 +1,211 @@
+import gzip
+import os
+import re
+from concurrent.futures.process import ProcessPoolExecutor
+from concurrent.futures.thread import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# every suffix a precompressed sibling can have, also the ones that are
+# not written because brotli is missing, so that stale ones are removed
+SUFFIXES = (".gz", ".br")
+COMPRESSIBLE = {".html", ".js", ".json", ".css", ".svg", ".txt", ".md", ".rst"}
+
+RAW_ELEMENTS = {"pre", "textarea", "script", "style"}
+TEXT, TAG_START, TAG, QUOTE, RAW, COMMENT = range(6)
+
+tag_name_re = re.compile(r"/?([a-z][\w-]*)", re.I)
+tag_end_re = re.compile(r"[\"'>]")
+space_re = re.compile(r"\s+")
+
+
+def collapse(text):
+    # a run of whitespace becomes a single newline or space, which renders
+    # the same outside of pre and friends
+    return space_re.sub(lambda m: "\n" if "\n" in m.group() else " ", text)
+
+
+class Minifier:
+    # collapses whitespace in html that arrives in blocks, but not in quoted
+    # attribute values, comments or pre, textarea, script and style; the
+    # scan state is kept between blocks and only the few characters that
+    # may continue a run of whitespace, a tag name or a closing tag are
+    # held back, so the result does not depend on where blocks are split
+    def __init__(self):
+        self.state = TEXT
+        self.carry = ""
+        self.quote = None
+        # the raw element the current tag opens, then the one being copied
+        self.raw = None
+        self.raw_end = None
+
+    def text(self, out, text, pos, end):
+        # collapses text[pos:end], whitespace at the end of the block is
+        # collapsed and held back, as it may go on in the next block
+        if end < len(text):
+            out.append(collapse(text[pos:end]))
+            return
+        segment = text[pos:].rstrip()
+        out.append(collapse(segment))
+        self.carry = collapse(text[pos + len(segment):])
+
+    def feed(self, block):
+        text = self.carry + block
+        self.carry = ""
+        out = []
+        pos = 0
+        size = len(text)
+        while pos < size:
+            if self.state == TEXT:
+                start = text.find("<", pos)
+                if start == -1:
+                    self.text(out, text, pos, size)
+                    break
+                out.append(collapse(text[pos:start]))
+                pos = start
+                self.state = TAG_START
+            elif self.state == TAG_START:
+                if text.startswith("<!--", pos):
+                    out.append("<!--")
+                    pos += 4
+                    self.state = COMMENT
+                    continue
+                if size - pos < 4 and "<!--".startswith(text[pos:]):
+                    # a comment may start with the next block
+                    self.carry = text[pos:]
+                    break
+                match = tag_name_re.match(text, pos + 1)
+                end = match.end() if match else pos + 1
+                if end == size:
+                    # the tag name may go on in the next block
+                    self.carry = text[pos:]
+                    break
+                name = match and not match.group().startswith("/") and match.group(1).lower()
+                self.raw = name if name in RAW_ELEMENTS else None
+                out.append(text[pos:end])
+                pos = end
+                self.state = TAG
+            elif self.state == TAG:
+                match = tag_end_re.search(text, pos)
+                if match is None:
+                    self.text(out, text, pos, size)
+                    break
+                out.append(collapse(text[pos:match.start()]))
+                out.append(match.group())
+                pos = match.end()
+                if match.group() != ">":
+                    self.quote = match.group()
+                    self.state = QUOTE
+                elif self.raw is not None:
+                    self.raw_end = re.compile(f"</{self.raw}(?![\\w-])", re.I)
+                    self.state = RAW
+                else:
+                    self.state = TEXT
+            elif self.state == COMMENT:
+                end = text.find("-->", pos)
+                if end == -1:
+                    cut = max(pos, size - 2)
+                    out.append(text[pos:cut])
+                    self.carry = text[cut:]
+                    break
+                out.append(text[pos:end + 3])
+                pos = end + 3
+                self.state = TEXT
+            elif self.state == QUOTE:
+                end = text.find(self.quote, pos)
+                if end == -1:
+                    out.append(text[pos:])
+                    break
+                out.append(text[pos:end + 1])
+                pos = end + 1
+                self.state = TAG
+            else:
+                match = self.raw_end.search(text, pos)
+                if match is None or match.end() == size:
+                    # a closing tag may start in the last few characters
+                    cut = max(pos, size - len(self.raw) - 2) if match is None else match.start()
+                    out.append(text[pos:cut])
+                    self.carry = text[cut:]
+                    break
+                out.append(text[pos:match.start()])
+                pos = match.start()
+                self.state = TAG_START
+        return "".join(out)
+
+    def flush(self):
+        text, self.carry = self.carry, ""
+        state, self.state = self.state, TEXT
+        return text if state in (QUOTE, RAW, COMMENT) else collapse(text)
+
+
+def minify(text):
+    minifier = Minifier()
+    return minifier.feed(text) + minifier.flush()
+
+
+def compressors():
+    # (suffix, function) of the siblings that are written
+    found = [(".gz", lambda data: gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        found.append((".br", brotli.compress))
+    return found
+
+
+def sibling(path, suffix):
+    return path.with_name(path.name + suffix)
+
+
+def compress_file(path):
+    data = path.read_bytes()
+    for suffix, compress in compressors():
+        sibling(path, suffix).write_bytes(compress(data))
+    return path
+
+
+def is_stale(path, suffix):
+    try:
+        return sibling(path, suffix).stat().st_mtime_ns < path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+
+def output_files(output_path):
+    for root, dirs, files in os.walk(output_path):
+        if root == os.fspath(output_path):
+            dirs[:] = [it for it in dirs if it != "__cache__"]
+        for name in files:
+            yield Path(root, name)
+
+
+def sync_compressed(output_path, enabled, jobs=None):
+    # writes the siblings of every output file whose siblings are missing
+    # or older than the file, so only changed pages and assets are
+    # compressed again; siblings of removed files are deleted, as are stale
+    # ones when compression is disabled; returns (compressed, removed)
+    stale = []
+    removed = 0
+    suffixes = [suffix for suffix, _ in compressors()]
+    for path in output_files(output_path):
+        if path.suffix in SUFFIXES:
+            original = path.with_suffix("")
+            kept = enabled and path.suffix in suffixes
+            if not original.exists() or not kept and is_stale(original, path.suffix):
+                path.unlink()
+                removed += 1
+        elif enabled and path.suffix in COMPRESSIBLE \
+                and any(is_stale(path, suffix) for suffix in suffixes):
+            stale.append(path)
+    if not stale:
+        return 0, removed
+    if jobs is None:
+        with ThreadPoolExecutor() as executor:
+            list(executor.map(compress_file, stale))
+    else:
+        jobs = jobs or os.cpu_count()
+        with ProcessPoolExecutor(jobs) as executor:
+            list(executor.map(compress_file, stale, chunksize=max(1, len(stale) // (jobs * 4))))
+    return len(stale), removed
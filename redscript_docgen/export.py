@@ -0,0 +1,232 @@
+import json
+import os
+import struct
+from array import array
+from bisect import bisect_right
+
+from redscript_docgen.cache import read_source
+from redscript_docgen.search import dump
+from redscript_docgen.store import CLASS_TYPES, ENUM_TYPES, FIELD_TYPES, FUNC_TYPES
+from redscript_docgen.template_env import type_name
+
+INDEX_VERSION = 1
+MAGIC = b"RSDI"
+
+# every record has these fields, in this order in the binary form; the
+# json lines leave out the ones that are None or empty
+STRING_FIELDS = ("kind", "name", "owner", "base", "type", "value", "file")
+LIST_FIELDS = ("qualifiers", "annotations")
+# and a line number, starting at 1
+
+header = struct.Struct("<4sH")
+length = struct.Struct("<I")
+
+
+def record(kind, name, owner, file, line, qualifiers=(), annotations=(), type=None,
+           base=None, value=None):
+    return {
+        "kind": kind, "name": name, "owner": owner, "base": base,
+        "type": None if type is None else type_name(type),
+        "value": None if value is None else str(value), "file": file, "line": line,
+        "qualifiers": [it for it in qualifiers if it], "annotations": list(annotations),
+    }
+
+
+def empty_record():
+    return {**dict.fromkeys(STRING_FIELDS), "line": 0, **{it: [] for it in LIST_FIELDS}}
+
+
+def member_records(member, owner, file, line):
+    if isinstance(member, FUNC_TYPES):
+        yield record("func", member.name, owner, file, line(member.line_pos),
+                     member.qualifiers, member.annotations, member.return_type)
+        func = member.name if owner is None else f"{owner}.{member.name}"
+        for param in member.parameters:
+            yield record("param", param.name, func, file, line(member.line_pos),
+                         param.qualifiers, type=param.type_)
+    elif isinstance(member, FIELD_TYPES):
+        yield record("field", member.name, owner, file, line(member.line_pos),
+                     member.qualifiers, member.annotations, member.type)
+
+
+def definition_records(definitions, file, line):
+    # line maps an offset in the source to its line; parameters and enum
+    # items are on the line of their function or enum
+    for definition in definitions:
+        if isinstance(definition, CLASS_TYPES):
+            yield record("struct" if definition.is_struct else "class", definition.name, None,
+                         file, line(definition.line_pos), definition.qualifiers,
+                         base=definition.base)
+            for member in definition.members:
+                yield from member_records(member, definition.name, file, line)
+        elif isinstance(definition, ENUM_TYPES):
+            yield record("enum", definition.name, None, file, line(definition.line_pos))
+            for item in definition.members:
+                yield record("item", item.name, definition.name, file,
+                             line(definition.line_pos), value=item.value)
+        else:
+            yield from member_records(definition, None, file, line)
+
+
+def line_starts(text):
+    starts = [0]
+    pos = text.find("\n")
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = text.find("\n", pos + 1)
+    return starts
+
+
+def source_lines(path):
+    # the offsets the lines of a source start at, the parsed definitions
+    # only know their offset
+    return array("I", line_starts(read_source(path.read_bytes())))
+
+
+def symbol_records(sources, lines):
+    # sources yields (rel_path, definitions), lines(rel_path) returns the
+    # source_lines of a source
+    for rel_path, definitions in sources:
+        starts = lines(rel_path)
+        yield from definition_records(
+            definitions, rel_path.as_posix(), lambda pos: bisect_right(starts, pos))
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class BinaryWriter:
+    # every record is prefixed with its length; a string is written where
+    # it is first used and referred to by its number after that, 0 is None
+    # and 1 a new string, so a reader never needs more than one record and
+    # the strings it has seen
+    def __init__(self, file):
+        self.file = file
+        self.strings = {}
+        file.write(header.pack(MAGIC, INDEX_VERSION))
+
+    def string(self, out, value):
+        if value is None:
+            out.append(0)
+            return
+        index = self.strings.get(value)
+        if index is not None:
+            write_varint(out, index + 2)
+            return
+        self.strings[value] = len(self.strings)
+        data = value.encode("UTF-8")
+        out.append(1)
+        write_varint(out, len(data))
+        out += data
+
+    def write(self, record):
+        out = bytearray()
+        for name in STRING_FIELDS:
+            self.string(out, record[name])
+        for name in LIST_FIELDS:
+            write_varint(out, len(record[name]))
+            for value in record[name]:
+                self.string(out, value)
+        write_varint(out, record["line"])
+        self.file.write(length.pack(len(out)))
+        self.file.write(out)
+
+
+class RecordReader:
+    def __init__(self, data, strings):
+        self.data = data
+        self.pos = 0
+        self.strings = strings
+
+    def varint(self):
+        value = shift = 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def string(self):
+        ref = self.varint()
+        if ref == 0:
+            return None
+        if ref > 1:
+            return self.strings[ref - 2]
+        size = self.varint()
+        value = self.data[self.pos:self.pos + size].decode("UTF-8")
+        self.pos += size
+        self.strings.append(value)
+        return value
+
+    def record(self):
+        result = {name: self.string() for name in STRING_FIELDS}
+        for name in LIST_FIELDS:
+            result[name] = [self.string() for _ in range(self.varint())]
+        result["line"] = self.varint()
+        return result
+
+
+def index_paths(path):
+    # the suffixes are appended, so a dotted name like sym.v2 is kept
+    return path.with_name(path.name + ".jsonl"), path.with_name(path.name + ".bin")
+
+
+def write_index(path, records):
+    # writes the json lines and the binary form next to each other, both are
+    # replaced at once so tools never read half an index; returns the count
+    jsonl_path, binary_path = index_paths(path)
+    jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+    jsonl_temp = jsonl_path.with_name(jsonl_path.name + ".tmp")
+    binary_temp = binary_path.with_name(binary_path.name + ".tmp")
+    count = 0
+    with open(jsonl_temp, "w", encoding="UTF-8", newline="\n") as jsonl_file, \
+            open(binary_temp, "wb") as binary_file:
+        jsonl_file.write(dump({"version": INDEX_VERSION}) + "\n")
+        binary = BinaryWriter(binary_file)
+        for item in records:
+            jsonl_file.write(dump({
+                name: value for name, value in item.items() if value is not None and value != []
+            }) + "\n")
+            binary.write(item)
+            count += 1
+    os.replace(jsonl_temp, jsonl_path)
+    os.replace(binary_temp, binary_path)
+    return count
+
+
+def read_jsonl(file):
+    # file is opened in text mode; yields complete records, one at a time
+    version = json.loads(file.readline()).get("version")
+    if version != INDEX_VERSION:
+        raise ValueError(f"unsupported symbol index version: {version}")
+    for line in file:
+        yield {**empty_record(), **json.loads(line)}
+
+
+def read_binary(file):
+    # file is opened in binary mode; yields the same records as read_jsonl
+    magic, version = header.unpack(file.read(header.size))
+    if magic != MAGIC or version != INDEX_VERSION:
+        raise ValueError(f"unsupported symbol index: {magic!r} version {version}")
+    strings = []
+    while True:
+        prefix = file.read(length.size)
+        if not prefix:
+            return
+        yield RecordReader(file.read(length.unpack(prefix)[0]), strings).record()
+
+
+def read_index(path):
+    # picks the reader by the suffix of path
+    if path.suffix == ".bin":
+        with open(path, "rb") as file:
+            yield from read_binary(file)
+    else:
+        with open(path, encoding="UTF-8") as file:
+            yield from read_jsonl(file)
@@ -0,0 +1,141 @@
+from collections import defaultdict, namedtuple
+
+from redscript_docgen.parser.model import stable_id
+from redscript_docgen.store import CLASS_TYPES
+
+# pages record the hierarchy of every class they show under this prefix,
+# with the fingerprint of the node as the value
+DEPENDENCY_PREFIX = "hierarchy:"
+
+# ancestors: base names, nearest first, ending at the first unknown base
+# subclasses, descendants: sorted class names
+# inherited: (owner name, [(member, href), ...]) nearest owner first,
+#   members that are not shadowed by the class or a nearer ancestor
+# overrides: member name -> name of the nearest ancestor it overrides
+HierarchyNode = namedtuple(
+    "HierarchyNode", ["ancestors", "subclasses", "descendants", "inherited", "overrides"])
+
+EMPTY_NODE = HierarchyNode((), (), (), (), {})
+
+
+class HierarchyIndex:
+    # built once per index, so that templates look up the ancestors,
+    # subclasses and inherited members of a class instead of walking the
+    # namespace on every use
+    def __init__(self, namespace_root, link_table, recorder=None):
+        self.namespace_root = namespace_root
+        self.link_table = link_table
+        self.recorder = recorder
+        self.classes = {}
+        # name -> (ancestors, subclasses, descendants) of every class
+        self.graph = {}
+        self.nodes = {}
+        self.fingerprints = {}
+
+    def build(self):
+        # the class graph is walked here, the inherited members are only
+        # collected when a page asks for the node of a class, which is all a
+        # served page or a worker rendering some of the pages needs
+        self.nodes.clear()
+        self.fingerprints.clear()
+        self.graph.clear()
+        classes = self.classes = {
+            name: definition
+            for name, definition in self.namespace_root.reverse_map.items()
+            if isinstance(name, str) and isinstance(definition, CLASS_TYPES)
+        }
+        children = defaultdict(list)
+        for name, definition in classes.items():
+            if definition.base in classes:
+                children[definition.base].append(name)
+
+        descendants = {}
+
+        def collect(name, seen):
+            if name not in descendants:
+                result = set()
+                for child in children.get(name, ()):
+                    if child not in seen:
+                        result.add(child)
+                        result.update(collect(child, seen | {child}))
+                descendants[name] = result
+            return descendants[name]
+
+        for name, definition in classes.items():
+            self.graph[name] = (
+                tuple(self.ancestors(definition, classes)),
+                tuple(sorted(children.get(name, ()))),
+                tuple(sorted(collect(name, {name}))))
+
+    def node(self, name):
+        try:
+            return self.nodes[name]
+        except KeyError:
+            pass
+        ancestors, subclasses, descendants = self.graph[name]
+        inherited, overrides = self.inherited(self.classes[name], ancestors, self.classes)
+        node = self.nodes[name] = HierarchyNode(
+            ancestors, subclasses, descendants, tuple(inherited), overrides)
+        return node
+
+    def ancestors(self, definition, classes):
+        result = []
+        seen = {definition.name}
+        base = definition.base
+        while base and base not in seen:
+            result.append(base)
+            seen.add(base)
+            parent = classes.get(base)
+            if parent is None:
+                break
+            base = parent.base
+        return result
+
+    def inherited(self, definition, ancestors, classes):
+        own = {member.name for member in definition.members}
+        seen = set(own)
+        inherited = []
+        overrides = {}
+        for ancestor in ancestors:
+            parent = classes.get(ancestor)
+            if parent is None:
+                break
+            group = []
+            for member in parent.members:
+                if member.name in seen:
+                    if member.name in own:
+                        overrides.setdefault(member.name, ancestor)
+                    continue
+                seen.add(member.name)
+                group.append((member, self.member_href(ancestor, member)))
+            if group:
+                inherited.append((ancestor, group))
+        return inherited, overrides
+
+    def member_href(self, owner, member):
+        target = self.link_table.target(owner)
+        if target is None:
+            return None
+        return f"{target.partition('#')[0]}#{member.id}"
+
+    def fingerprint(self, name):
+        if name not in self.graph:
+            return None
+        try:
+            return self.fingerprints[name]
+        except KeyError:
+            node = self.node(name)
+            parts = [*node.ancestors, "", *node.subclasses, "", *node.descendants, ""]
+            for owner, group in node.inherited:
+                parts.append(owner)
+                parts.extend(f"{member.name} {href}" for member, href in group)
+            parts.extend(f"{member} {owner}" for member, owner in sorted(node.overrides.items()))
+            result = self.fingerprints[name] = stable_id("\n".join(parts))
+            return result
+
+    def __getitem__(self, name):
+        if name not in self.graph:
+            return EMPTY_NODE
+        if self.recorder is not None:
+            self.recorder.record(DEPENDENCY_PREFIX + name, self.fingerprint(name))
+        return self.node(name)
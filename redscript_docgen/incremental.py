@@ -0,0 +1,129 @@
+import hashlib
+import json
+import sqlite3
+from collections import namedtuple
+from pathlib import Path
+
+from redscript_docgen import compress, hierarchy, pages, template_env
+
+# one node per output page: the source files of the definitions on the
+# page, every link target the page resolved while rendering, the digest
+# of the written page and the content digests of the sources it was
+# rendered from
+PageNode = namedtuple(
+    "PageNode", ["sources", "links", "digest", "source_digests"], defaults=(None, None))
+
+
+def page_key(namespace):
+    return "/".join(namespace)
+
+
+def render_stamp(mode, base_uri, compiled_path=None, minify=False, page_budget=None):
+    # changes whenever anything besides the definitions and link targets
+    # could change the rendered output
+    digest = hashlib.sha1(f"{mode}\0{base_uri}\0{page_budget}".encode())
+    modules = [hierarchy, pages, template_env]
+    if minify:
+        digest.update(b"\0minify")
+        modules.append(compress)
+    for module in modules:
+        digest.update(Path(module.__file__).read_bytes())
+    template_dirs = [Path("templates", mode)]
+    if compiled_path is not None:
+        template_dirs.append(Path(compiled_path, mode))
+    for template_dir in template_dirs:
+        for path in sorted(template_dir.glob("**/*")):
+            if path.is_file():
+                digest.update(path.relative_to(template_dir).as_posix().encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class LinkRecorder:
+    def __init__(self):
+        self.links = None
+
+    def start(self):
+        self.links = {}
+
+    def record(self, name, href):
+        if self.links is not None:
+            self.links[name] = href
+
+    def stop(self):
+        links, self.links = self.links, None
+        return links
+
+
+class PageGraph:
+    def __init__(self, path, stamp):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                page TEXT PRIMARY KEY,
+                stamp TEXT NOT NULL,
+                sources TEXT NOT NULL,
+                links TEXT NOT NULL,
+                digest TEXT,
+                source_digests TEXT
+            )""")
+        columns = {it[1] for it in self.db.execute("PRAGMA table_info(pages)")}
+        for column in ("digest", "source_digests"):
+            if column not in columns:
+                self.db.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+        self.stamp = stamp
+        self.nodes = {
+            page: PageNode(tuple(json.loads(sources)), json.loads(links), digest,
+                           source_digests and tuple(json.loads(source_digests)))
+            for page, sources, links, digest, source_digests in self.db.execute(
+                "SELECT page, sources, links, digest, source_digests FROM pages"
+                " WHERE stamp = ?",
+                (stamp, ))
+        }
+        self.updates = {}
+
+    def is_current(self, page, sources, source_digests, resolve):
+        # source_digests are the content digests of sources, comparing them
+        # instead of what changed in this run also catches sources that
+        # were parsed by a run that stopped before rendering
+        node = self.nodes.get(page)
+        if node is None or node.sources != sources or node.source_digests != source_digests:
+            return False
+        return all(
+            resolve(name) == href
+            for name, href in node.links.items()
+        )
+
+    def digest(self, page):
+        node = self.nodes.get(page)
+        return None if node is None else node.digest
+
+    def update(self, page, sources, links, digest=None, source_digests=None):
+        self.nodes[page] = PageNode(sources, links, digest, source_digests)
+        self.updates[page] = (
+            page, self.stamp, json.dumps(sources), json.dumps(links), digest,
+            None if source_digests is None else json.dumps(source_digests))
+
+    def retain(self, pages):
+        stored = {page for page, in self.db.execute("SELECT page FROM pages")}
+        removed = (stored | set(self.nodes)) - set(pages)
+        for page in removed:
+            self.nodes.pop(page, None)
+            self.updates.pop(page, None)
+        with self.db:
+            self.db.executemany(
+                "DELETE FROM pages WHERE page = ?",
+                [(page, ) for page in removed])
+        return removed
+
+    def flush(self):
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                self.updates.values())
+        self.updates.clear()
+
+    def close(self):
+        self.flush()
+        self.db.close()
@@ -1,116 +1,117 @@
 # coding: utf-8
 import logging
-from collections import defaultdict
-from concurrent.futures.thread import ThreadPoolExecutor
-from functools import partial
 from pathlib import Path
-import pickle
 import click
 
-from redscript_docgen.parser import parse, Class, Enum, Func, Field
-from redscript_docgen.template_env import init_env
+from redscript_docgen.build import Builder
+from redscript_docgen.parser import PARSERS
+from redscript_docgen.profiling import Profiler
+from redscript_docgen.render import DEFAULT_FLUSH_SIZE
+from redscript_docgen.serve import serve
+from redscript_docgen.watch import watch as watch_changes
 
 logging.basicConfig(level=logging.DEBUG,
                     format="%(levelname)s %(asctime)s %(threadName)s %(message)s")
 log = logging.getLogger()
 
 
-class Namespace:
-    def __init__(self, name):
-        self.name = name
-        self.forward_map = defaultdict(list)
-        self.reverse_map = {}
+class DefaultCommandGroup(click.Group):
+    # arguments that do not start with a command name are for the build
+    # command, so the command line from before serve existed still works
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = ["build", *args]
+        return super().parse_args(ctx, args)
 
-    def add_definition(self, definition):
-        parts = definition.file_path.parent.parts
-        self.forward_map[parts].append(definition)
-        self.reverse_map[definition.name] = definition
-        if hasattr(definition, "members"):
-            for member in definition.members:
-                self.reverse_map[definition.name, member.name] = member
 
-    def __contains__(self, item):
-        return item in self.reverse_map
+@click.group(cls=DefaultCommandGroup)
+def cli():
+    pass
 
-    def __getitem__(self, item):
-        return self.reverse_map[item]
 
-
-def definition_name_sort(definition):
-    if isinstance(definition, Enum):
-        return 1, definition.name
-    if isinstance(definition, Class):
-        return 2, definition.name
-    if isinstance(definition, Func):
-        return 1, definition.name
-    if isinstance(definition, Field):
-        return 1, definition.name
-
-
-def load_parse_source(cache_path, file_arg):
-    abs_path, rel_path = file_arg
-    item_cache_path = cache_path / rel_path
-
-    try:
-        with item_cache_path.open("rb") as fp:
-            return pickle.load(fp)
-    except Exception:
-        pass
-
-    with abs_path.open("r", encoding="UTF-8") as fp:
-        try:
-            log.debug(f"parsing: {abs_path}")
-            result = parse(fp.read(), rel_path)
-
-            item_cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with item_cache_path.open("wb") as cache_fp:
-                pickle.dump(result, cache_fp)
-
-            return result
-        except Exception as e:
-            log.error("processing: %s failed: %s", abs_path.as_uri(), e)
-            return []
-
-
-@click.command()
+@cli.command("build", help="Generate the documentation of DIRECTORY into OUTPUT_DIR.")
 @click.argument("directory", type=click.Path(
     exists=True, file_okay=False, readable=True, resolve_path=True))
 @click.argument("output_dir")
 @click.option("--base-uri", type=str, default=None)
 @click.option("--mode", type=click.Choice(["html", "rst", "md"], case_sensitive=False), default="html")
-def main(directory, output_dir, base_uri, mode):
+@click.option("--parser", type=click.Choice(sorted(PARSERS)), default="peg")
+@click.option("--jobs", "-j", type=click.IntRange(min=0), default=None,
+              help="Parse in N worker processes, 0 uses all cores. "
+                   "Without this option files are parsed in threads.")
+@click.option("--force", is_flag=True,
+              help="Render every page, not only pages whose inputs changed.")
+@click.option("--watch", is_flag=True,
+              help="Keep running and rebuild when sources change.")
+@click.option("--poll-interval", type=float, default=1.0,
+              help="Seconds between checks when inotify is unavailable.")
+@click.option("--compiled-templates", type=click.Path(exists=True, file_okay=False),
+              default=None,
+              help="Load templates precompiled with "
+                   "`python -m redscript_docgen.template_env DIR` from DIR.")
+@click.option("--compact-index", is_flag=True,
+              help="Keep parsed definitions in a compact columnar store, "
+                   "for corpora whose index does not fit in memory otherwise.")
+@click.option("--flush-size", type=click.IntRange(min=1), default=DEFAULT_FLUSH_SIZE,
+              help="Characters of a page rendered before they are written out.")
+@click.option("--profile", is_flag=True,
+              help="Report wall and CPU time per phase and the slowest files and pages.")
+@click.option("--profile-top", type=click.IntRange(min=1), default=10,
+              help="Number of slowest files and pages to report.")
+@click.option("--profile-dir", type=click.Path(file_okay=False), default=None,
+              help="With --profile, also dump cProfile stats per phase to DIR.")
+@click.option("--low-memory", is_flag=True,
+              help="Build in two passes: collect the symbols of every file first, then "
+                   "load, render and drop one page at a time.")
+@click.option("--prescan", is_flag=True,
+              help="Split changed files into top-level declarations that are parsed and "
+                   "cached one by one, a syntax error only drops its own declaration.")
+@click.option("--minify", is_flag=True,
+              help="Collapse whitespace in html pages while they are written.")
+@click.option("--precompress", is_flag=True,
+              help="Write .gz siblings, and .br ones if brotli is installed, for every "
+                   "changed page and asset.")
+@click.option("--page-budget", type=click.IntRange(min=1), default=None,
+              help="Split namespace pages with more definitions and class members than this "
+                   "into pages per first letter or per name.")
+@click.option("--emit-index", type=click.Path(dir_okay=False), default=None,
+              help="Also write the symbols of every source, with owners, qualifiers, "
+                   "annotations, types, files and lines, to PATH.jsonl and PATH.bin.")
+def main(directory, output_dir, base_uri, mode, parser, jobs, force, watch, poll_interval,
+         compiled_templates, compact_index, flush_size, profile, profile_top, profile_dir,
+         low_memory, prescan, minify, precompress, page_budget, emit_index):
+    if low_memory and watch:
+        raise click.UsageError("--watch cannot be combined with --low-memory")
+    if low_memory and compact_index:
+        raise click.UsageError("--compact-index cannot be combined with --low-memory")
+    if minify and mode != "html":
+        raise click.UsageError("--minify only applies to --mode html")
+    if page_budget is not None and mode != "html":
+        raise click.UsageError("--page-budget only applies to --mode html")
     directory = Path(directory)
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     if base_uri is None:
         base_uri = output_path.absolute().as_uri()
-    namespace_root = Namespace("global")
-    env, mode_ext = init_env(mode, base_uri, namespace_root)
-    cache_path = output_path / "__cache__"
-    files = [
-        (it, it.relative_to(directory))
-        for it in directory.glob("**/*.script")
-        if it.is_file()
-    ]
-    log.info("found %s files to process", len(files))
-    with ThreadPoolExecutor() as executor:
-        for file_definitions in executor.map(partial(load_parse_source, cache_path), files):
-            for definition in file_definitions:
-                namespace_root.add_definition(definition)
-    log.info("finished parsing")
+    if emit_index is not None:
+        emit_index = Path(emit_index)
+    profiler = Profiler(profile_top, profile_dir) if profile else None
+    builder = Builder(directory, output_path, base_uri, mode, parser, jobs, compiled_templates,
+                      compact_index, flush_size, profiler, low_memory, prescan,
+                      minify, precompress, page_budget, emit_index)
+    try:
+        builder.build(force)
+        log.info("generation complete")
+        if profiler is not None:
+            profiler.log_report()
+        if watch:
+            watch_changes(builder, poll_interval)
+    finally:
+        builder.close()
 
-    template = env.get_template("definition.tpl")
-    for namespace, definition_group in namespace_root.forward_map.items():
-        if namespace:
-            definition_output_path = output_path / Path(*namespace[:-1], namespace[-1] + mode_ext)
-        else:
-            definition_output_path = output_path / ("global" + mode_ext)
-        definition_output_path.parent.mkdir(parents=True, exist_ok=True)
-        with definition_output_path.open("w", encoding="UTF-8") as fp:
-            fp.write(template.render(namespace=namespace, definitions=definition_group))
 
-    log.info("generation complete")
+cli.add_command(serve)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
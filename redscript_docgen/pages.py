@@ -0,0 +1,148 @@
+import os
+from collections import defaultdict
+
+from redscript_docgen.search import dump, write_if_changed
+from redscript_docgen.store import CLASS_TYPES
+
+NAV_VERSION = 1
+
+
+def subpage(namespace, key):
+    # the parts of a split namespace are written next to its page
+    if namespace:
+        return (*namespace[:-1], f"{namespace[-1]}.{key}")
+    return (f"global.{key}", )
+
+
+def folded(namespace):
+    return tuple(it.casefold() for it in namespace)
+
+
+def free_page(page, taken):
+    # a part whose page is that of a directory, like the part X of a/b and
+    # a/b.X, gets a suffix; names are compared like split_definitions does
+    candidate = page
+    count = 1
+    while folded(candidate) in taken:
+        count += 1
+        candidate = (*page[:-1], f"{page[-1]}-{count}")
+    taken.add(folded(candidate))
+    return candidate
+
+
+def page_href(base_uri, namespace, ext):
+    return os.path.join(base_uri, *(namespace or ("global", ))) + ext
+
+
+def definition_page(pages, definition):
+    # the namespace of the page a definition is shown on
+    return pages.get(definition.id) or definition.file_path.parent.parts
+
+
+def entry_count(definition):
+    # the budget counts definitions and class members, which symbols know
+    # as well, so both build modes split the same way
+    if isinstance(definition, CLASS_TYPES):
+        return 1 + len(definition.members)
+    return 1
+
+
+def letter(name):
+    first = name[:1].upper()
+    return first if first.isalnum() else "_"
+
+
+def name_keys(names):
+    # names that only differ in case would share a file on case-insensitive
+    # file systems, the later ones get a suffix no identifier has
+    keys = []
+    seen = defaultdict(int)
+    for name in names:
+        folded = name.casefold()
+        seen[folded] += 1
+        keys.append(name if seen[folded] == 1 else f"{name}-{seen[folded]}")
+    return keys
+
+
+def split_definitions(definitions, budget):
+    # [(key, definitions)]: a part per first letter, letters with more than
+    # budget entries get a part per name; the order of definitions is kept
+    groups = defaultdict(list)
+    for definition in definitions:
+        groups[letter(definition.name)].append(definition)
+    parts = []
+    for key in sorted(groups):
+        group = groups[key]
+        if sum(map(entry_count, group)) <= budget:
+            parts.append((key, group))
+            continue
+        names = defaultdict(list)
+        for definition in group:
+            names[definition.name].append(definition)
+        ordered = sorted(names)
+        parts.extend(zip(name_keys(ordered), (names[it] for it in ordered)))
+    return parts
+
+
+def split_pages(page_map, budget):
+    # replaces every namespace in page_map with more than budget entries by
+    # its parts; returns (stubs, pages): [(subpage, key, ids)] for every
+    # split namespace and the subpage of every definition and member id
+    # that moved, the page of the namespace becomes a redirect stub
+    stubs = {}
+    pages = {}
+    taken = set(map(folded, page_map))
+    for namespace in sorted(page_map):
+        definitions = page_map[namespace]
+        if sum(map(entry_count, definitions)) <= budget:
+            continue
+        del page_map[namespace]
+        stub = stubs[namespace] = []
+        for key, part in split_definitions(definitions, budget):
+            page = free_page(subpage(namespace, key), taken)
+            page_map[page] = part
+            ids = []
+            for definition in part:
+                ids.append(definition.id)
+                if isinstance(definition, CLASS_TYPES):
+                    ids.extend(member.id for member in definition.members)
+            pages.update(dict.fromkeys(ids, page))
+            stub.append((page, key, sorted(ids)))
+    return stubs, pages
+
+
+def redirects(parts, href):
+    # what the stub needs to send an old anchor to its part
+    return {
+        "pages": [href(page) for page, _, _ in parts],
+        "ids": {id: index for index, (_, _, ids) in enumerate(parts) for id in ids},
+    }
+
+
+def nav_tree(namespaces, stubs, href):
+    # nested {"name", "href", "parts", "children"} nodes of every page,
+    # children by directory and parts being the pages of a split namespace
+    root = {"name": "", "href": None, "parts": [], "children": {}}
+    for namespace in namespaces:
+        node = root
+        for name in namespace or ("global", ):
+            node = node["children"].setdefault(
+                name, {"name": name, "href": None, "parts": [], "children": {}})
+        node["href"] = href(namespace)
+        node["parts"] = [[key, href(page)] for page, key, _ in stubs.get(namespace, ())]
+
+    def finish(node):
+        node["children"] = [finish(it) for _, it in sorted(node["children"].items())]
+        return node
+
+    return finish(root)["children"]
+
+
+def write_nav(output_path, namespaces, stubs, href):
+    # one manifest for the sidebar of every page, instead of repeating the
+    # tree in each of them
+    subpages = {page for parts in stubs.values() for page, _, _ in parts}
+    namespaces = sorted(it for it in namespaces if it not in subpages)
+    nav = {"version": NAV_VERSION, "pages": nav_tree(namespaces, stubs, href)}
+    write_if_changed(output_path / "nav.json", dump(nav))
+    return nav
@@ -1,11 +1,33 @@
-from redscript_docgen.parser import grammar
+import hashlib
+from pathlib import Path
+
+from redscript_docgen.parser import grammar, descent, model, prescan, scan, transform
 from redscript_docgen.parser.model import Type, Func, Param, Enum, EnumItem, \
     Class, Field
-from redscript_docgen.parser.transform import Visitor
+from redscript_docgen.parser.transform import Compiler
+
+
+def parse_peg(source_string, file_path):
+    return Compiler(file_path).compile(grammar.grammar.parse(source_string))
+
+
+PARSERS = {
+    "peg": parse_peg,
+    "descent": descent.parse,
+}
+
+
+def parse(source_string, file_path, parser="peg"):
+    return PARSERS[parser](source_string, file_path)
 
 
-def parse(source_string, file_path):
-    return Visitor(file_path).visit(grammar.grammar.parse(source_string))
+def parser_version(parser):
+    # changes whenever the parser backend, grammar or model changes, so
+    # cached parse results from older code are never reused
+    digest = hashlib.sha1(parser.encode())
+    for module in (grammar, descent, model, prescan, scan, transform):
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,269 @@
+import re
+
+from redscript_docgen.parser.model import (
+    Func, Param, Type, Enum, EnumItem, Class, Field)
+from redscript_docgen.parser.scan import skip_block, skip_comment
+
+
+QUALIFIERS = frozenset((
+    "public", "protected", "private", "static", "final", "const", "native",
+    "exec", "cb", "abstract", "persistent", "inline", "edit", "rep"))
+PARAM_QUALIFIERS = frozenset(("out", "opt"))
+
+IDENT = "ident"
+NUMBER = "number"
+STRING = "string"
+SYMBOL = "symbol"
+EOF = "eof"
+
+token_re = re.compile(r"""
+    (?P<ws>\s+)
+    | (?P<line_comment>//[^\r\n]*)
+    | (?P<block_comment>/\*)
+    | (?P<ident>(?a:[a-z_][\w\.]*))
+    | (?P<number>(?a:-?\d+(?:\.\d*)?f?))
+    | (?P<string>"(?:[^\\"]|\\.)*")
+    | (?P<symbol>->|.)
+""", re.VERBOSE | re.IGNORECASE | re.DOTALL)
+
+integer_re = re.compile(r"-?\d+", re.ASCII)
+
+
+class ParseError(ValueError):
+    def __init__(self, text, pos, message):
+        self.text = text
+        self.pos = pos
+        self.message = message
+        super().__init__(message)
+
+    def line(self):
+        return self.text.count("\n", 0, self.pos) + 1
+
+    def column(self):
+        return self.pos - self.text.rfind("\n", 0, self.pos)
+
+    def __str__(self):
+        return (f"{self.message} at {self.text[self.pos:self.pos + 20]!r} "
+                f"(line {self.line()}, column {self.column()})")
+
+
+class Parser:
+    # tokens are lexed on demand, so skipped function bodies are never
+    # tokenized
+    def __init__(self, text, file_path=None):
+        self.text = text
+        self.file_path = file_path
+        self.pos = 0
+        self.lookahead = []
+
+    def lex(self):
+        text = self.text
+        match = token_re.match
+        pos = self.pos
+        end = len(text)
+        while pos < end:
+            m = match(text, pos)
+            kind = m.lastgroup
+            if kind == "ws" or kind == "line_comment":
+                pos = m.end()
+            elif kind == "block_comment":
+                pos = skip_comment(text, pos)
+                if pos is None:
+                    raise ParseError(text, m.start(), "unterminated block comment")
+            else:
+                self.pos = m.end()
+                return kind, m.group(), pos
+        self.pos = end
+        return EOF, "", end
+
+    def error(self, message):
+        raise ParseError(self.text, self.peek()[2], message)
+
+    def peek(self, offset=0):
+        lookahead = self.lookahead
+        while len(lookahead) <= offset:
+            lookahead.append(self.lex())
+        return lookahead[offset]
+
+    def next(self):
+        token = self.peek()
+        del self.lookahead[0]
+        return token
+
+    def at(self, value):
+        return self.peek()[1] == value
+
+    def accept(self, value):
+        if self.peek()[1] == value:
+            del self.lookahead[0]
+            return True
+        return False
+
+    def expect(self, value):
+        if self.peek()[1] != value:
+            self.error(f"expected {value!r}")
+        del self.lookahead[0]
+
+    def expect_ident(self):
+        kind, value, _ = self.peek()
+        if kind != IDENT:
+            self.error("expected identifier")
+        del self.lookahead[0]
+        return value
+
+    def skip_until(self, value):
+        while not self.at(value):
+            if self.peek()[0] == EOF:
+                self.error(f"expected {value!r}")
+            del self.lookahead[0]
+
+    def definitions(self):
+        result = []
+        while self.peek()[0] != EOF:
+            result.append(self.definition())
+        return result
+
+    def definition(self):
+        start = self.peek()[2]
+        annotations = self.annotationlist()
+        qualifiers = self.qualifierlist()
+        keyword = self.peek()[1]
+        if keyword == "func":
+            return self.func(start, annotations, qualifiers)
+        if annotations:
+            self.error("expected func after annotations")
+        if keyword == "class" or keyword == "struct":
+            return self.class_(start, qualifiers)
+        if keyword == "enum":
+            return self.enum(start)
+        self.error("expected definition")
+
+    def annotationlist(self):
+        annotations = []
+        while self.at("@"):
+            annotations.append(self.annotation())
+        return annotations
+
+    def annotation(self):
+        start = self.next()[2]
+        self.expect_ident()
+        self.expect("(")
+        self.skip_until(")")
+        end = self.next()[2] + 1
+        return self.text[start:end]
+
+    def qualifierlist(self):
+        qualifiers = []
+        while self.peek()[1] in QUALIFIERS:
+            qualifiers.append(self.next()[1])
+        return qualifiers
+
+    def type_(self):
+        name = self.expect_ident()
+        if not self.accept("<"):
+            return Type(name)
+        argument = self.type_()
+        if self.accept(";"):
+            self.skip_until(">")
+        self.expect(">")
+        return Type(name, [argument])
+
+    def parameters(self):
+        self.expect("(")
+        params = []
+        if not self.accept(")"):
+            params.append(self.param())
+            while self.accept(","):
+                params.append(self.param())
+            self.expect(")")
+        return params
+
+    def param(self):
+        qualifier = ""
+        if self.peek()[1] in PARAM_QUALIFIERS and self.peek(1)[0] == IDENT:
+            qualifier = self.next()[1]
+        name = self.expect_ident()
+        self.expect(":")
+        return Param(name, self.type_(), [qualifier])
+
+    def func_sig(self, start, annotations, qualifiers):
+        self.expect("func")
+        name = self.next()[1] if self.peek()[0] == IDENT else ""
+        parameters = self.parameters()
+        self.expect("->")
+        return Func(
+            self.file_path, start, annotations, qualifiers, name,
+            parameters, self.type_())
+
+    def func(self, start, annotations, qualifiers):
+        result = self.func_sig(start, annotations, qualifiers)
+        if self.at("{"):
+            self.func_body()
+        else:
+            self.accept(";")
+        return result
+
+    def func_body(self):
+        start = self.peek()[2]
+        end = skip_block(self.text, start)
+        if end is None:
+            self.error("unterminated function body")
+        self.pos = end
+        self.lookahead.clear()
+
+    def class_field(self, start, annotations, qualifiers):
+        self.expect("let")
+        name = self.expect_ident()
+        self.expect(":")
+        type_ = self.type_()
+        self.expect(";")
+        return Field(self.file_path, start, annotations, qualifiers, name, type_)
+
+    def class_member(self):
+        start = self.peek()[2]
+        annotations = self.annotationlist()
+        qualifiers = self.qualifierlist()
+        if self.at("let"):
+            return self.class_field(start, annotations, qualifiers)
+        if self.at("func"):
+            return self.func(start, annotations, qualifiers)
+        self.error("expected class member")
+
+    def class_(self, start, qualifiers):
+        is_struct = self.next()[1] == "struct"
+        name = self.expect_ident()
+        base = None
+        if self.accept("extends"):
+            base = self.expect_ident()
+        self.expect("{")
+        members = []
+        while not self.accept("}"):
+            members.append(self.class_member())
+        return Class(
+            self.file_path, start, qualifiers, name, base, members, is_struct)
+
+    def enum_decl(self):
+        name = self.expect_ident()
+        self.expect("=")
+        kind, value, _ = self.peek()
+        # enum values are integers, like in the grammar
+        if kind != NUMBER or not integer_re.fullmatch(value):
+            self.error("expected enum value")
+        del self.lookahead[0]
+        return EnumItem(name, value)
+
+    def enum(self, start):
+        self.expect("enum")
+        name = self.expect_ident()
+        self.expect("{")
+        members = []
+        while not self.accept("}"):
+            members.append(self.enum_decl())
+            if not self.accept(","):
+                self.expect("}")
+                break
+        return Enum(self.file_path, start, name, members)
+
+
+def parse(source_string, file_path):
+    return Parser(source_string, file_path).definitions()
@@ -1,5 +1,7 @@
 from parsimonious import Grammar
 
+from redscript_docgen.parser.scan import skip_block, skip_comment
+
 
 ws = r"""
     _                = comment / line_comment / ~"\s*"
@@ -62,14 +64,16 @@ params = r"""
 """
 
 function = r"""
-    func              = func_sig _ func_body?
+    func              = func_sig _ (func_body / func_end)?
     func_sig          = annotationlist qualifierlist "func" _ func_name _ parameters _ func_return_type
     func_name         = ident?
     func_return_type  = "->" _ type
     func_body_start   = lbrace
     func_body_end     = rbrace
-    func_body_content = func_body / (!func_body_start !func_body_end ~"."s)
-    func_body         = func_body_start func_body_content* func_body_end _
+    func_body_content = func_body_block / (!func_body_start !func_body_end ~"."s)
+    func_body_block   = func_body_start func_body_content* func_body_end
+    func_body         = func_body_block _
+    func_end          = ";" _
 """
 
 enum = r"""
@@ -102,5 +106,9 @@ grammar = Grammar(
     + qualifier
     + ws
     + symbols
-    + ident
+    + ident,
+    # the rules above consume bodies and comments a character at a time,
+    # the full grammar jumps to the matching end in one step instead
+    func_body_block=skip_block,
+    comment=skip_comment,
 )
@@ -1,16 +1,50 @@
+import hashlib
+import weakref
+
+
+def stable_id(value):
+    # unlike hash() this does not change between runs and processes, so
+    # anchors stay the same across builds
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
 
-class Type:
-    __slots__ = ["name", "arguments"]
 
-    def __init__(self, name, arguments=None):
+class Type:
+    # types are interned: every occurrence of the same type shares one
+    # object with a precomputed hash, also after unpickling; the table only
+    # holds types that are still in use, so long running builds do not
+    # keep every type they ever parsed
+    __slots__ = ["name", "arguments", "_hash", "__weakref__"]
+    interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, name, arguments=None):
+        arguments = tuple() if arguments is None else tuple(arguments)
+        key = name, arguments
+        try:
+            return cls.interned[key]
+        except KeyError:
+            pass
+        self = super().__new__(cls)
         self.name = name
-        self.arguments = tuple() if arguments is None else tuple(arguments)
+        self.arguments = arguments
+        self._hash = hash(key)
+        return cls.interned.setdefault(key, self)
+
+    def __reduce__(self):
+        return Type, (self.name, self.arguments)
 
     def __repr__(self):
         return f"Type({self.name}, {self.arguments})"
 
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Type):
+            return NotImplemented
+        return self.name == other.name and self.arguments == other.arguments
+
     def __hash__(self):
-        return hash(repr(self))
+        return self._hash
 
 
 class Func:
@@ -27,7 +61,7 @@ class Func:
 
     @property
     def id(self):
-        return hash(f"{self.name}{self.file_path}{self.line_pos}")
+        return stable_id(f"{self.name}{self.file_path}{self.line_pos}")
 
     def __repr__(self):
         return f"Func({self.file_path}, {self.line_pos}, {self.annotations}, {self.qualifiers}, {self.name}, {self.parameters}, {self.return_type})"
@@ -56,7 +90,7 @@ class Enum:
 
     @property
     def id(self):
-        return hash(f"{self.name}{self.file_path}{self.line_pos}")
+        return stable_id(f"{self.name}{self.file_path}{self.line_pos}")
 
     def __repr__(self):
         return f"Enum({self.file_path}, {self.line_pos}, {self.name}, {self.members})"
@@ -87,7 +121,7 @@ class Class:
 
     @property
     def id(self):
-        return hash(f"{self.name}{self.file_path}{self.line_pos}")
+        return stable_id(f"{self.name}{self.file_path}{self.line_pos}")
 
     def __repr__(self):
         return f"Class({self.file_path}, {self.line_pos}, {self.qualifiers}, {self.name}, {self.base}, {self.members}, {self.is_struct})"
@@ -106,7 +140,7 @@ class Field:
 
     @property
     def id(self):
-        return hash(f"{self.name}{self.file_path}{self.line_pos}")
+        return stable_id(f"{self.name}{self.file_path}{self.line_pos}")
 
     def __repr__(self):
         return f"Field({self.annotations}, {self.qualifiers}, {self.name}, {self.type})"
@@ -0,0 +1,84 @@
+import hashlib
+import re
+
+from redscript_docgen.parser.descent import Parser, ParseError, EOF, QUALIFIERS
+from redscript_docgen.parser.scan import skip_block
+
+# where a declaration the scanner does not understand probably ends: the
+# next unindented line that starts like a declaration, the error itself may
+# be reported at the end of the text
+recover_re = re.compile(
+    r"^(?:@|(?:(?:%s)\s+)*(?:class|struct|enum|func)\b)" % "|".join(sorted(QUALIFIERS)),
+    re.MULTILINE)
+
+
+class DeclarationScanner(Parser):
+    # walks over top-level declarations like Parser.definition, without
+    # building the model and skipping class and enum bodies as blocks
+    def skip_body(self):
+        end = skip_block(self.text, self.peek()[2])
+        if end is None:
+            self.error("unterminated block")
+        self.pos = end
+        self.lookahead.clear()
+
+    def declaration(self):
+        self.annotationlist()
+        self.qualifierlist()
+        keyword = self.next()[1]
+        if keyword in ("class", "struct", "enum"):
+            self.skip_until("{")
+            self.skip_body()
+        elif keyword == "func":
+            self.skip_until("->")
+            self.next()
+            self.type_()
+            if self.at("{"):
+                self.skip_body()
+            else:
+                self.accept(";")
+        else:
+            self.error("expected declaration")
+
+
+def split_declarations(text):
+    # (start, end) spans of the top-level declarations, every span runs up
+    # to the start of the next one, so comments between declarations belong
+    # to the one before
+    scanner = DeclarationScanner(text)
+    starts = []
+    while True:
+        try:
+            kind, _, start = scanner.peek()
+        except ParseError:
+            # an unterminated comment, it is reported when the span is parsed
+            if not starts:
+                starts.append(0)
+            break
+        if kind == EOF:
+            break
+        starts.append(start)
+        try:
+            scanner.declaration()
+        except ParseError as e:
+            match = recover_re.search(text, start + 1)
+            scanner.pos = match.start() if match else len(text)
+            scanner.lookahead.clear()
+    return list(zip(starts, starts[1:] + [len(text)]))
+
+
+def span_digest(span):
+    return hashlib.sha1(span.encode("UTF-8")).hexdigest()
+
+
+def rebase(definitions, file_path, offset):
+    # definitions of a span are parsed and cached without a file path and
+    # with positions relative to the span
+    for definition in definitions:
+        definition.file_path = file_path
+        definition.line_pos += offset
+        for member in getattr(definition, "members", ()):
+            if hasattr(member, "line_pos"):
+                member.file_path = file_path
+                member.line_pos += offset
+    return definitions
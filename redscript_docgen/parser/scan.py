@@ -0,0 +1,57 @@
+import re
+
+comment_re = re.compile(r"/\*|\*/")
+block_re = re.compile(r"[{}\"]|/[/*]")
+string_re = re.compile(r"\"(?:[^\\\"]|\\.)*\"", re.DOTALL)
+line_end_re = re.compile(r"\r\n|\r|\n")
+
+
+def skip_comment(text, pos):
+    # end of the (nested) block comment at pos, None if unterminated
+    if not text.startswith("/*", pos):
+        return None
+    depth = 0
+    for match in comment_re.finditer(text, pos):
+        if match.group() == "/*":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return None
+
+
+def skip_block(text, pos):
+    # end of the brace block at pos, skipping braces in strings and
+    # comments, None if unterminated
+    if not text.startswith("{", pos):
+        return None
+    depth = 0
+    search = block_re.search
+    while True:
+        match = search(text, pos)
+        if match is None:
+            return None
+        char = match.group()
+        if char == "{":
+            depth += 1
+            pos = match.end()
+        elif char == "}":
+            depth -= 1
+            pos = match.end()
+            if depth == 0:
+                return pos
+        elif char == "\"":
+            string = string_re.match(text, match.start())
+            if string is None:
+                return None
+            pos = string.end()
+        elif char == "//":
+            line_end = line_end_re.search(text, match.end())
+            if line_end is None:
+                return None
+            pos = line_end.end()
+        else:
+            pos = skip_comment(text, match.start())
+            if pos is None:
+                return None
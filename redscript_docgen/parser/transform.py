@@ -184,4 +184,97 @@ class Visitor(NodeVisitor):
         return vc[1]
 
     def generic_visit(self, node, visited_children):
-        return list(filter(None, visited_children)) or node
\ No newline at end of file
+        return list(filter(None, visited_children)) or node
+
+
+class Compiler:
+    # builds the model straight from the parse tree, descending only into
+    # the nodes that carry model values; children are picked by their
+    # position in the grammar rules, so this has to follow grammar.py
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def compile(self, node):
+        definitions = []
+        for definition in node.children[1].children:
+            definition = definition.children[0]
+            if definition.expr_name == "func":
+                definitions.append(self.func(definition))
+            elif definition.expr_name == "class":
+                definitions.append(self.class_(definition))
+            else:
+                definitions.append(self.enum(definition))
+        return definitions
+
+    def texts(self, node):
+        # annotationlist and qualifierlist, (item ws)*
+        return [it.children[0].text for it in node.children]
+
+    def type_(self, node):
+        wrapped = node.children[2].children
+        if wrapped:
+            return Type(node.children[0].text, [self.type_(wrapped[0].children[2])])
+        return Type(node.children[0].text, [])
+
+    def param(self, node):
+        ident = node.children[0].children
+        return Param(ident[1].text, self.type_(node.children[2]), [ident[0].text.strip()])
+
+    def func(self, node):
+        sig = node.children[0]
+        c = sig.children
+        parameters = []
+        if c[6].children[2].children:
+            param_list = c[6].children[2].children[0]
+            parameters.append(self.param(param_list.children[0]))
+            for it in param_list.children[1].children:
+                parameters.append(self.param(it.children[1]))
+        return Func(
+            self.file_path,
+            sig.start,
+            self.texts(c[0]),
+            self.texts(c[1]),
+            c[4].text,
+            parameters,
+            self.type_(c[8].children[2])
+        )
+
+    def enum(self, node):
+        c = node.children
+        items = []
+        if c[4].children[2].children:
+            enum_list = c[4].children[2].children[0]
+            decls = [enum_list.children[0], *(it.children[3] for it in enum_list.children[1].children)]
+            items = [EnumItem(it.children[0].text, it.children[4].text) for it in decls]
+        return Enum(self.file_path, node.start, c[2].text, items)
+
+    def field(self, node):
+        c = node.children
+        return Field(
+            self.file_path,
+            node.start,
+            self.texts(c[0]),
+            self.texts(c[1]),
+            c[4].text,
+            self.type_(c[8])
+        )
+
+    def class_(self, node):
+        c = node.children
+        extends = c[5].children
+        members = []
+        for member in c[7].children[1].children:
+            member = member.children[0]
+            if member.expr_name == "class_field":
+                members.append(self.field(member))
+            elif member.expr_name == "func":
+                members.append(self.func(member))
+        return Class(
+            self.file_path,
+            node.start,
+            self.texts(c[0]),
+            c[3].text,
+            extends[0].children[2].text if extends else None,
+            members,
+            c[1].text == "struct"
+        )
@@ -0,0 +1,104 @@
+import contextlib
+import cProfile
+import logging
+import os
+import time
+from collections import namedtuple
+
+log = logging.getLogger()
+
+PhaseTime = namedtuple("PhaseTime", ["wall", "cpu"])
+
+# report order; page writes overlap the render phase, the render phase
+# includes waiting on a full write queue
+PHASES = ("discover", "parse", "index", "render", "write", "compress")
+
+
+def cpu_time():
+    # includes worker processes once they exited, which they have by the
+    # end of every phase that uses them
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def count_nodes(definitions):
+    count = 0
+    for definition in definitions:
+        count += 1
+        count += count_nodes(getattr(definition, "members", ()))
+        count += len(getattr(definition, "parameters", ()))
+    return count
+
+
+class NullProfiler:
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+    def add(self, name, wall, cpu):
+        pass
+
+    def file(self, rel_path, elapsed, definitions):
+        pass
+
+    def page(self, page, elapsed):
+        pass
+
+
+class Profiler(NullProfiler):
+    # phase wall and cpu time, parse time and node count per file and
+    # render time per page; with pstats_path set every phase is also run
+    # under cProfile and dumped to <phase>.pstats
+    def __init__(self, top=10, pstats_path=None):
+        self.top = top
+        self.pstats_path = pstats_path
+        self.phases = {}
+        self.files = []
+        self.pages = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        profile = None
+        if self.pstats_path is not None:
+            profile = cProfile.Profile()
+            profile.enable()
+        wall = time.perf_counter()
+        cpu = cpu_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, cpu_time() - cpu)
+            if profile is not None:
+                profile.disable()
+                os.makedirs(self.pstats_path, exist_ok=True)
+                profile.dump_stats(os.path.join(self.pstats_path, f"{name}.pstats"))
+
+    def add(self, name, wall, cpu):
+        total = self.phases.get(name, PhaseTime(0.0, 0.0))
+        self.phases[name] = PhaseTime(total.wall + wall, total.cpu + cpu)
+
+    def file(self, rel_path, elapsed, definitions):
+        self.files.append((elapsed, count_nodes(definitions), rel_path))
+
+    def page(self, page, elapsed):
+        self.pages.append((elapsed, page))
+
+    def report(self):
+        lines = ["phase        wall s     cpu s"]
+        phases = sorted(
+            self.phases.items(),
+            key=lambda it: PHASES.index(it[0]) if it[0] in PHASES else len(PHASES))
+        for name, phase in phases:
+            lines.append(f"{name:<10} {phase.wall:>8.3f}  {phase.cpu:>8.3f}")
+        if self.files:
+            lines.append(f"slowest {min(self.top, len(self.files))} of {len(self.files)} parsed files:")
+            for elapsed, nodes, rel_path in sorted(self.files, key=lambda it: it[0], reverse=True)[:self.top]:
+                lines.append(f"{elapsed * 1000:>10.1f} ms {nodes:>8} nodes  {rel_path}")
+        if self.pages:
+            lines.append(f"slowest {min(self.top, len(self.pages))} of {len(self.pages)} rendered pages:")
+            for elapsed, page in sorted(self.pages, key=lambda it: it[0], reverse=True)[:self.top]:
+                lines.append(f"{elapsed * 1000:>10.1f} ms  {page or 'global'}")
+        return lines
+
+    def log_report(self):
+        for line in self.report():
+            log.info("profile: %s", line)
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import pickle
+import queue
+import threading
+import time
+from concurrent.futures.process import ProcessPoolExecutor
+from functools import partial
+
+from redscript_docgen.compress import Minifier
+from redscript_docgen.incremental import LinkRecorder
+from redscript_docgen.template_env import build_indexes, init_env
+
+DEFAULT_FLUSH_SIZE = 64 * 1024
+
+
+def file_digest(path):
+    # the digest PageFile computes for the page that is on disk
+    try:
+        return hashlib.sha1(path.read_text(encoding="UTF-8").encode("UTF-8")).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class PageFile:
+    # a page is written to a temporary file next to it and hashed on the
+    # way, it only replaces the existing page when the digest changed, so
+    # unchanged pages keep their mtime
+    def __init__(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.temp_path = path.with_name(path.name + ".tmp")
+        self.fp = self.temp_path.open("w", encoding="UTF-8")
+        self.digest = hashlib.sha1()
+
+    def write(self, block):
+        self.fp.write(block)
+        self.digest.update(block.encode("UTF-8"))
+
+    def abort(self):
+        self.fp.close()
+        self.temp_path.unlink()
+
+    def close(self, previous=None):
+        # previous is the digest of the last written page, None to compare
+        # with the page on disk; returns (digest, written)
+        self.fp.close()
+        digest = self.digest.hexdigest()
+        if previous is None:
+            previous = file_digest(self.path)
+        if digest == previous and self.path.exists():
+            self.temp_path.unlink()
+            return digest, False
+        os.replace(self.temp_path, self.path)
+        return digest, True
+
+
+class PageWriter:
+    # writes pages on a background thread, the bounded queue keeps the
+    # renderer from running too far ahead of the disk; pages arrive as a
+    # series of blocks and end with end(path, previous), results maps the
+    # path of every page to (digest, written) once the writer is closed
+    def __init__(self, maxsize=32):
+        self.queue = queue.Queue(maxsize)
+        self.error = None
+        self.results = {}
+        # time spent writing, for profiling
+        self.busy = 0.0
+        self.cpu = 0.0
+        self.thread = threading.Thread(target=self.run, name="PageWriter", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        page = None
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue
+            path, block, previous = item
+            start = time.perf_counter()
+            cpu = time.thread_time()
+            try:
+                if page is None:
+                    page = PageFile(path)
+                if block is None:
+                    self.results[path] = page.close(previous)
+                    page = None
+                else:
+                    page.write(block)
+            except Exception as e:
+                self.error = e
+            self.busy += time.perf_counter() - start
+            self.cpu += time.thread_time() - cpu
+        if page is not None:
+            page.abort()
+
+    def put(self, item):
+        if self.error is not None:
+            raise self.error
+        self.queue.put(item)
+
+    def write(self, path, block):
+        self.put((path, block, None))
+
+    def end(self, path, previous=None):
+        self.put((path, None, previous))
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+class PageRenderer:
+    # env_options are the init_env arguments besides the namespace; with
+    # minify set whitespace is collapsed while the page is streamed
+    def __init__(self, namespace_root, env_options, env=None, recorder=None,
+                 flush_size=DEFAULT_FLUSH_SIZE, minify=False):
+        self.namespace_root = namespace_root
+        self.env_options = env_options
+        self.flush_size = flush_size
+        self.minify = minify
+        if env is None:
+            recorder = LinkRecorder()
+            env, _ = init_env(namespace=namespace_root, recorder=recorder, **env_options)
+            build_indexes(env)
+        self.recorder = recorder
+        self.template = env.get_template("definition.tpl")
+        self.env = env
+
+    def render_to(self, namespace, write):
+        # streams the page to write() in blocks of about flush_size
+        # characters, so a page is never held in memory as a whole
+        stub = self.namespace_root.stubs.get(namespace)
+        if stub is None:
+            chunks = self.template.generate(
+                namespace=namespace, definitions=self.namespace_root.forward_map[namespace])
+        else:
+            chunks = self.env.get_template("stub.tpl").generate(namespace=namespace, parts=stub)
+        minifier = Minifier() if self.minify else None
+        self.recorder.start()
+        buffer = []
+        size = 0
+        for chunk in chunks:
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= self.flush_size:
+                block = "".join(buffer)
+                write(block if minifier is None else minifier.feed(block))
+                buffer.clear()
+                size = 0
+        block = "".join(buffer)
+        if minifier is not None:
+            block = minifier.feed(block) + minifier.flush()
+        if block:
+            write(block)
+        return self.recorder.stop()
+
+    def render_file(self, namespace, path, previous=None):
+        # returns (links, digest, written), see PageFile
+        page = PageFile(path)
+        try:
+            links = self.render_to(namespace, page.write)
+        except BaseException:
+            page.abort()
+            raise
+        return (links, *page.close(previous))
+
+
+# the renderer of a worker process, built once from the pickled index
+worker_renderer = None
+
+
+def init_worker(payload, env_options, flush_size, minify):
+    global worker_renderer
+    worker_renderer = PageRenderer(
+        pickle.loads(payload), env_options, flush_size=flush_size, minify=minify)
+
+
+def render_in_worker(page):
+    namespace, path, previous = page
+    start = time.perf_counter()
+    links, digest, written = worker_renderer.render_file(namespace, path, previous)
+    return namespace, links, time.perf_counter() - start, digest, written
+
+
+def render_pages(renderer, writer, pages, jobs=None):
+    # pages are (namespace, path, previous digest), yields (namespace,
+    # links, elapsed) for every page once it is rendered; the digests end
+    # up in writer.results either way
+    if jobs is None or len(pages) < 2:
+        for namespace, path, previous in pages:
+            start = time.perf_counter()
+            links = renderer.render_to(namespace, partial(writer.write, path))
+            writer.end(path, previous)
+            yield namespace, links, time.perf_counter() - start
+        return
+
+    # the index is pickled once here instead of once per page, workers
+    # write their pages themselves
+    payload = pickle.dumps(renderer.namespace_root, pickle.HIGHEST_PROTOCOL)
+    jobs = min(jobs or os.cpu_count(), len(pages))
+    chunksize = max(1, min(16, len(pages) // (jobs * 4)))
+    initargs = payload, renderer.env_options, renderer.flush_size, renderer.minify
+    paths = {namespace: path for namespace, path, _ in pages}
+    with ProcessPoolExecutor(jobs, initializer=init_worker, initargs=initargs) as executor:
+        for namespace, links, elapsed, digest, written in executor.map(
+                render_in_worker, pages, chunksize=chunksize):
+            writer.results[paths[namespace]] = digest, written
+            yield namespace, links, elapsed
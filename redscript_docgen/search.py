@@ -0,0 +1,132 @@
+import json
+import re
+import shutil
+from collections import defaultdict
+from pathlib import Path
+
+from redscript_docgen.store import CLASS_TYPES, ENUM_TYPES, FIELD_TYPES, FUNC_TYPES
+from redscript_docgen.symbols import Symbol
+
+SEARCH_VERSION = 1
+# shards with more entries than this are split by a longer prefix
+MAX_SHARD_ENTRIES = 1000
+MAX_PREFIX = 6
+
+word_re = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def name_terms(name):
+    # the whole name and its camel case and underscore separated words,
+    # so that "health" finds GetHealth
+    terms = {name.lower()}
+    terms.update(word.lower() for word in word_re.findall(name) if len(word) > 1)
+    return terms
+
+
+def definition_kind(definition):
+    if isinstance(definition, Symbol):
+        return definition.kind
+    if isinstance(definition, CLASS_TYPES):
+        return "c"
+    if isinstance(definition, FUNC_TYPES):
+        return "f"
+    if isinstance(definition, FIELD_TYPES):
+        return "v"
+    if isinstance(definition, ENUM_TYPES):
+        return "e"
+
+
+def symbols(forward_map, page_href):
+    # yields [name, kind, owner, href] for every definition and class member
+    for namespace in sorted(forward_map):
+        page = page_href(namespace)
+        for definition in forward_map[namespace]:
+            yield [definition.name, definition_kind(definition), "", f"{page}#{definition.id}"]
+            if isinstance(definition, CLASS_TYPES):
+                for member in definition.members:
+                    yield [member.name, definition_kind(member), definition.name,
+                           f"{page}#{member.id}"]
+
+
+def shard_terms(terms, depth=1):
+    # terms maps a term to its entry ids; yields (prefix, terms) with every
+    # group split by longer prefixes until it is small enough, terms shorter
+    # than a split prefix end up in a shard of their own
+    groups = defaultdict(dict)
+    for term, ids in terms.items():
+        groups[term[:depth]][term] = ids
+    for prefix, group in sorted(groups.items()):
+        entries = sum(len(ids) for ids in group.values())
+        if entries > MAX_SHARD_ENTRIES and depth < MAX_PREFIX and len(group) > 1 \
+                and len(prefix) == depth:
+            yield from shard_terms(group, depth + 1)
+        else:
+            yield prefix, group
+
+
+def build_search_index(forward_map, page_href):
+    # forward_map maps namespaces to their definitions or symbols; returns
+    # (manifest, {file name: shard}), each shard carries the entries its
+    # terms refer to, so a lookup loads a single small file; entries are
+    # sorted so the shards do not depend on the order of the definitions
+    entries = sorted(symbols(forward_map, page_href))
+    terms = defaultdict(list)
+    for index, entry in enumerate(entries):
+        for term in name_terms(entry[0]):
+            terms[term].append(index)
+
+    shards = {}
+    manifest = {"version": SEARCH_VERSION, "count": len(entries), "shards": {}}
+    for prefix, group in shard_terms(terms):
+        local = {}
+        shard = {"terms": {}, "entries": []}
+        for term in sorted(group):
+            ids = []
+            for index in group[term]:
+                if index not in local:
+                    local[index] = len(shard["entries"])
+                    shard["entries"].append(entries[index])
+                ids.append(local[index])
+            shard["terms"][term] = ids
+        file_name = f"{prefix}.json"
+        manifest["shards"][prefix] = file_name
+        shards[file_name] = shard
+    return manifest, shards
+
+
+def dump(value):
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+
+def write_if_changed(path, text):
+    try:
+        if path.read_text(encoding="UTF-8") == text:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_text(text, encoding="UTF-8")
+    return True
+
+
+def write_search_index(output_path, forward_map, page_href):
+    search_path = output_path / "search"
+    search_path.mkdir(parents=True, exist_ok=True)
+    manifest, shards = build_search_index(forward_map, page_href)
+    for file_name, shard in shards.items():
+        write_if_changed(search_path / file_name, dump(shard))
+    write_if_changed(search_path / "manifest.json", dump(manifest))
+    for path in search_path.glob("*.json"):
+        if path.name != "manifest.json" and path.name not in shards:
+            path.unlink()
+    return manifest
+
+
+def copy_static(mode, output_path):
+    # files in templates/<mode>/static are copied to the output root
+    static_path = Path("templates", mode, "static")
+    for path in sorted(static_path.glob("**/*")):
+        if path.is_file():
+            target = output_path / path.relative_to(static_path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if not target.exists() or target.read_bytes() != path.read_bytes():
+                shutil.copyfile(path, target)
@@ -0,0 +1,236 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+import click
+
+from redscript_docgen.build import Builder
+from redscript_docgen.parser import PARSERS
+from redscript_docgen.render import PageRenderer
+from redscript_docgen.watch import snapshot
+
+log = logging.getLogger()
+
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+
+HTML_TYPE = "text/html; charset=utf-8"
+# files of the output directory that are served, pages are always rendered
+ASSET_TYPES = {
+    ".js": "text/javascript; charset=utf-8",
+    ".json": "application/json",
+    ".css": "text/css; charset=utf-8",
+}
+
+# a rendered page and what it was rendered from, like a PageGraph node
+CachedPage = namedtuple("CachedPage", ["body", "sources", "links"])
+
+
+def file_state(path):
+    # what watch.snapshot records for a file
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PageCache:
+    # the least recently used pages are dropped once the bodies take more
+    # than max_size bytes, pages larger than that are not kept at all
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.pages = OrderedDict()
+
+    def get(self, key):
+        page = self.pages.get(key)
+        if page is not None:
+            self.pages.move_to_end(key)
+        return page
+
+    def put(self, key, page):
+        self.pop(key)
+        if len(page.body) > self.max_size:
+            return
+        self.pages[key] = page
+        self.size += len(page.body)
+        while self.size > self.max_size:
+            _, evicted = self.pages.popitem(last=False)
+            self.size -= len(evicted.body)
+
+    def pop(self, key):
+        page = self.pages.pop(key, None)
+        if page is not None:
+            self.size -= len(page.body)
+
+    def retain(self, keep):
+        for key, page in list(self.pages.items()):
+            if not keep(key, page):
+                self.pop(key)
+
+
+class DocServer:
+    # renders pages of a builder that only parsed and indexed the sources
+    # when they are requested; the sources are checked for changes at most
+    # every check_interval seconds, and whenever the sources of a requested
+    # page changed, changed files are parsed again and only the cached
+    # pages that depend on them are dropped
+    def __init__(self, builder, cache_size=DEFAULT_CACHE_SIZE, check_interval=1.0):
+        self.builder = builder
+        self.cache = PageCache(cache_size)
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.renderer = PageRenderer(builder.namespace_root, builder.env_options, builder.env,
+                                     builder.recorder, builder.flush_size)
+        self.state = {}
+        self.checked = 0.0
+        self.page_sources = {}
+        self.routes = {}
+        self.assets_current = False
+
+    def load(self):
+        builder = self.builder
+        self.state = snapshot(builder.directory)
+        self.checked = time.monotonic()
+        builder.parse(builder.discover(), builder.jobs)
+        self.reindex()
+
+    def reindex(self):
+        builder = self.builder
+        builder.index()
+        self.page_sources = builder.page_sources()
+        self.routes = {builder.page_href(namespace): namespace for namespace in self.page_sources}
+        self.assets_current = False
+
+    def check(self, sources=()):
+        directory = self.builder.directory
+        now = time.monotonic()
+        if now - self.checked < self.check_interval and all(
+                file_state(directory / it) == self.state.get(directory / it) for it in sources):
+            return
+        self.checked = now
+        state = snapshot(directory)
+        changed = {
+            path for path in state.keys() | self.state.keys()
+            if state.get(path) != self.state.get(path)
+        }
+        self.state = state
+        if changed:
+            self.refresh(changed)
+
+    def refresh(self, paths):
+        changed_sources = self.builder.reparse(paths)
+        if not changed_sources:
+            return
+        self.reindex()
+        self.cache.retain(lambda namespace, page: self.is_current(namespace, page, changed_sources))
+        log.info("%s sources changed, %s pages still cached", len(changed_sources),
+                 len(self.cache.pages))
+
+    def is_current(self, namespace, page, changed_sources):
+        resolve = self.builder.resolve
+        return page.sources == self.page_sources.get(namespace) \
+            and changed_sources.isdisjoint(page.sources) \
+            and all(resolve(name) == href for name, href in page.links.items())
+
+    def page(self, namespace):
+        page = self.cache.get(namespace)
+        if page is None:
+            blocks = []
+            links = self.renderer.render_to(namespace, blocks.append)
+            page = CachedPage(
+                "".join(blocks).encode("UTF-8"), self.page_sources[namespace], links)
+            self.cache.put(namespace, page)
+        return page.body
+
+    def asset(self, path):
+        builder = self.builder
+        if not self.assets_current:
+            builder.write_search()
+            builder.write_nav()
+            self.assets_current = True
+        root = builder.output_path.resolve()
+        file_path = (root / path).resolve()
+        if root not in file_path.parents or file_path.relative_to(root).parts[0] == "__cache__" \
+                or file_path.suffix not in ASSET_TYPES or not file_path.is_file():
+            return HTTPStatus.NOT_FOUND, {}, b"not found"
+        return HTTPStatus.OK, {"Content-Type": ASSET_TYPES[file_path.suffix]}, \
+            file_path.read_bytes()
+
+    def get(self, path):
+        # path is relative to the root, returns (status, headers, body)
+        with self.lock:
+            self.check(self.page_sources.get(self.routes.get(path), ()))
+            if not path:
+                location = self.builder.base_uri + "/" + min(self.routes, default="")
+                return HTTPStatus.FOUND, {"Location": location}, b""
+            namespace = self.routes.get(path)
+            if namespace is not None:
+                return HTTPStatus.OK, {"Content-Type": HTML_TYPE}, self.page(namespace)
+            return self.asset(path)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = unquote(urlsplit(self.path).path).lstrip("/")
+        try:
+            status, headers, body = self.server.docs.get(path)
+        except Exception:
+            log.exception("serving %s failed", path)
+            status, headers, body = HTTPStatus.INTERNAL_SERVER_ERROR, {}, b"internal error"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("serve: " + format, *args)
+
+
+@click.command()
+@click.argument("directory", type=click.Path(
+    exists=True, file_okay=False, readable=True, resolve_path=True))
+@click.argument("output_dir")
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", type=click.IntRange(0, 65535), default=8000)
+@click.option("--parser", type=click.Choice(sorted(PARSERS)), default="peg")
+@click.option("--jobs", "-j", type=click.IntRange(min=0), default=None,
+              help="Parse in N worker processes, 0 uses all cores.")
+@click.option("--page-budget", type=click.IntRange(min=1), default=None,
+              help="Split namespace pages like the build command does.")
+@click.option("--cache-size", type=click.IntRange(min=1), default=DEFAULT_CACHE_SIZE >> 20,
+              help="Megabytes of rendered pages kept in memory.")
+@click.option("--check-interval", type=click.FloatRange(min=0), default=1.0,
+              help="Seconds between checks of the sources for changes.")
+def serve(directory, output_dir, host, port, parser, jobs, page_budget, cache_size,
+          check_interval):
+    """Serve the documentation of DIRECTORY, rendering pages on request.
+
+    OUTPUT_DIR holds the parse cache, a build into the same directory makes
+    the server start fast.
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    server = ThreadingHTTPServer((host, port), RequestHandler)
+    host, port = server.server_address[:2]
+    builder = Builder(Path(directory), output_path, f"http://{host}:{port}", "html", parser,
+                      jobs, page_budget=page_budget)
+    try:
+        start = time.perf_counter()
+        server.docs = DocServer(builder, cache_size << 20, check_interval)
+        server.docs.load()
+        log.info("loaded %s pages in %.2fs, serving on http://%s:%s/",
+                 len(server.docs.routes), time.perf_counter() - start, host, port)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        builder.close()
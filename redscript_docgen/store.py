@@ -0,0 +1,254 @@
+from array import array
+
+from redscript_docgen.parser.model import stable_id, Class, Func, Field, Enum
+from redscript_docgen.symbols import ClassSymbol
+
+
+class Table:
+    # interns values and hands out their index, index 0 is always None
+    def __init__(self):
+        self.values = [None]
+        self.index = {None: 0}
+
+    def add(self, value):
+        try:
+            return self.index[value]
+        except KeyError:
+            index = self.index[value] = len(self.values)
+            self.values.append(value)
+            return index
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class Columns:
+    # one typed array per attribute of a definition kind
+    def __init__(self, **typecodes):
+        self.names = tuple(typecodes)
+        for name, typecode in typecodes.items():
+            setattr(self, name, array(typecode))
+
+    def append(self, **values):
+        for name in self.names:
+            getattr(self, name).append(values[name])
+        return len(self) - 1
+
+    def __len__(self):
+        return len(getattr(self, self.names[0]))
+
+
+def column(kind, name, table=None):
+    if table is None:
+        def get(self):
+            return getattr(getattr(self.store, kind), name)[self.index]
+    else:
+        def get(self):
+            return getattr(self.store, table)[getattr(getattr(self.store, kind), name)[self.index]]
+    return property(get)
+
+
+class View:
+    __slots__ = ["store", "index"]
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def id(self):
+        return stable_id(f"{self.name}{self.file_path}{self.line_pos}")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name})"
+
+
+class ParamView(View):
+    __slots__ = []
+    name = column("params", "name", "strings")
+    type_ = column("params", "type_", "types")
+    qualifiers = column("params", "qualifiers", "lists")
+
+
+class FuncView(View):
+    __slots__ = []
+    file_path = column("funcs", "file_path", "paths")
+    line_pos = column("funcs", "line_pos")
+    annotations = column("funcs", "annotations", "lists")
+    qualifiers = column("funcs", "qualifiers", "lists")
+    name = column("funcs", "name", "strings")
+    return_type = column("funcs", "return_type", "types")
+
+    @property
+    def parameters(self):
+        start = self.store.funcs.params_start[self.index]
+        count = self.store.funcs.params_count[self.index]
+        return [ParamView(self.store, it) for it in range(start, start + count)]
+
+
+class FieldView(View):
+    __slots__ = []
+    file_path = column("fields", "file_path", "paths")
+    line_pos = column("fields", "line_pos")
+    annotations = column("fields", "annotations", "lists")
+    qualifiers = column("fields", "qualifiers", "lists")
+    name = column("fields", "name", "strings")
+    type = column("fields", "type", "types")
+
+
+class ClassView(View):
+    __slots__ = []
+    file_path = column("classes", "file_path", "paths")
+    line_pos = column("classes", "line_pos")
+    qualifiers = column("classes", "qualifiers", "lists")
+    name = column("classes", "name", "strings")
+    base = column("classes", "base", "strings")
+
+    @property
+    def is_struct(self):
+        return bool(self.store.classes.is_struct[self.index])
+
+    @property
+    def members(self):
+        store = self.store
+        start = store.classes.members_start[self.index]
+        count = store.classes.members_count[self.index]
+        return [
+            store.member_views[store.members.kind[it]](store, store.members.index[it])
+            for it in range(start, start + count)
+        ]
+
+
+class EnumItemView(View):
+    __slots__ = []
+    name = column("items", "name", "strings")
+    value = column("items", "value", "strings")
+
+
+class EnumView(View):
+    __slots__ = []
+    file_path = column("enums", "file_path", "paths")
+    line_pos = column("enums", "line_pos")
+    name = column("enums", "name", "strings")
+
+    @property
+    def members(self):
+        start = self.store.enums.items_start[self.index]
+        count = self.store.enums.items_count[self.index]
+        return [EnumItemView(self.store, it) for it in range(start, start + count)]
+
+
+# isinstance checks that accept both parsed objects and store views, class
+# symbols stand in for classes in the low memory mode
+CLASS_TYPES = Class, ClassView, ClassSymbol
+FUNC_TYPES = Func, FuncView
+FIELD_TYPES = Field, FieldView
+ENUM_TYPES = Enum, EnumView
+
+
+class DefinitionStore:
+    # a compact alternative to keeping the parsed objects alive: names,
+    # paths, qualifier and annotation lists and types are interned into
+    # tables, every definition kind is a set of array columns and the
+    # index holds small views instead of the objects
+    member_views = FuncView, FieldView
+
+    def __init__(self):
+        self.strings = Table()
+        self.paths = Table()
+        self.lists = Table()
+        self.types = Table()
+        self.definitions = 0
+        self.funcs = Columns(
+            file_path="I", line_pos="q", annotations="I", qualifiers="I",
+            name="I", return_type="I", params_start="I", params_count="I")
+        self.params = Columns(name="I", type_="I", qualifiers="I")
+        self.fields = Columns(
+            file_path="I", line_pos="q", annotations="I", qualifiers="I",
+            name="I", type="I")
+        self.classes = Columns(
+            file_path="I", line_pos="q", qualifiers="I", name="I", base="I",
+            is_struct="b", members_start="I", members_count="I")
+        self.members = Columns(kind="b", index="I")
+        self.enums = Columns(
+            file_path="I", line_pos="q", name="I", items_start="I", items_count="I")
+        self.items = Columns(name="I", value="I")
+
+    def add_func(self, func):
+        parameters = func.parameters
+        start = len(self.params)
+        for param in parameters:
+            self.params.append(
+                name=self.strings.add(param.name),
+                type_=self.types.add(param.type_),
+                qualifiers=self.lists.add(tuple(param.qualifiers)))
+        return FuncView(self, self.funcs.append(
+            file_path=self.paths.add(func.file_path),
+            line_pos=func.line_pos,
+            annotations=self.lists.add(tuple(func.annotations)),
+            qualifiers=self.lists.add(tuple(func.qualifiers)),
+            name=self.strings.add(func.name),
+            return_type=self.types.add(func.return_type),
+            params_start=start,
+            params_count=len(parameters)))
+
+    def add_field(self, field):
+        return FieldView(self, self.fields.append(
+            file_path=self.paths.add(field.file_path),
+            line_pos=field.line_pos,
+            annotations=self.lists.add(tuple(field.annotations)),
+            qualifiers=self.lists.add(tuple(field.qualifiers)),
+            name=self.strings.add(field.name),
+            type=self.types.add(field.type)))
+
+    def add_class(self, class_):
+        # members are added first, their (kind, index) pairs are contiguous
+        members = []
+        for member in class_.members:
+            if isinstance(member, FUNC_TYPES):
+                members.append((0, self.add_func(member).index))
+            elif isinstance(member, FIELD_TYPES):
+                members.append((1, self.add_field(member).index))
+        start = len(self.members)
+        for kind, index in members:
+            self.members.append(kind=kind, index=index)
+        return ClassView(self, self.classes.append(
+            file_path=self.paths.add(class_.file_path),
+            line_pos=class_.line_pos,
+            qualifiers=self.lists.add(tuple(class_.qualifiers)),
+            name=self.strings.add(class_.name),
+            base=self.strings.add(class_.base),
+            is_struct=bool(class_.is_struct),
+            members_start=start,
+            members_count=len(members)))
+
+    def add_enum(self, enum):
+        start = len(self.items)
+        for item in enum.members:
+            self.items.append(
+                name=self.strings.add(item.name),
+                value=self.strings.add(item.value))
+        return EnumView(self, self.enums.append(
+            file_path=self.paths.add(enum.file_path),
+            line_pos=enum.line_pos,
+            name=self.strings.add(enum.name),
+            items_start=start,
+            items_count=len(enum.members)))
+
+    def add(self, definition):
+        self.definitions += 1
+        if isinstance(definition, CLASS_TYPES):
+            return self.add_class(definition)
+        if isinstance(definition, FUNC_TYPES):
+            return self.add_func(definition)
+        if isinstance(definition, FIELD_TYPES):
+            return self.add_field(definition)
+        if isinstance(definition, ENUM_TYPES):
+            return self.add_enum(definition)
+        raise TypeError(f"unknown definition: {definition!r}")
+
+    def add_all(self, definitions):
+        return [self.add(it) for it in definitions]
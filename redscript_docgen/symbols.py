@@ -0,0 +1,82 @@
+from collections import defaultdict
+
+from redscript_docgen.parser.model import Class, Enum, Field, Func
+
+
+class Symbol:
+    # what link resolution and the search index need of a definition;
+    # kind is the search index kind
+    __slots__ = ["name", "file_path", "id", "kind"]
+
+    def __init__(self, name, file_path, id, kind):
+        self.name = name
+        self.file_path = file_path
+        self.id = id
+        self.kind = kind
+
+    def __repr__(self):
+        return f"Symbol({self.name}, {self.file_path}, {self.kind})"
+
+
+class ClassSymbol(Symbol):
+    # the hierarchy index also needs the base and the member names
+    __slots__ = ["base", "members"]
+
+    def __init__(self, name, file_path, id, kind, base, members):
+        super().__init__(name, file_path, id, kind)
+        self.base = base
+        self.members = members
+
+
+def symbol_kind(definition):
+    if isinstance(definition, Class):
+        return "c"
+    if isinstance(definition, Func):
+        return "f"
+    if isinstance(definition, Field):
+        return "v"
+    if isinstance(definition, Enum):
+        return "e"
+
+
+def make_symbol(definition):
+    kind = symbol_kind(definition)
+    if kind == "c":
+        members = tuple(
+            Symbol(member.name, member.file_path, member.id, symbol_kind(member))
+            for member in definition.members)
+        return ClassSymbol(
+            definition.name, definition.file_path, definition.id, kind, definition.base, members)
+    return Symbol(definition.name, definition.file_path, definition.id, kind)
+
+
+class SymbolTable:
+    # stands in for Namespace in the low memory mode: reverse_map only
+    # holds symbols and forward_map only the definitions of the page that
+    # is being rendered, symbol_map has the symbols of every page
+    def __init__(self, name):
+        self.name = name
+        self.forward_map = {}
+        self.reverse_map = {}
+        self.symbol_map = defaultdict(list)
+        # see pages.split_pages
+        self.stubs = {}
+        self.pages = {}
+
+    def add_definitions(self, definitions):
+        for definition in definitions:
+            symbol = make_symbol(definition)
+            self.symbol_map[definition.file_path.parent.parts].append(symbol)
+            self.reverse_map[definition.name] = symbol
+
+    def page_sources(self):
+        return {
+            namespace: tuple(sorted({it.file_path.as_posix() for it in symbols}))
+            for namespace, symbols in self.symbol_map.items()
+        }
+
+    def __contains__(self, item):
+        return item in self.reverse_map
+
+    def __getitem__(self, item):
+        return self.reverse_map[item]
@@ -1,25 +1,29 @@
 import os
 
-from jinja2 import contextfilter, Environment, FileSystemLoader
-from markupsafe import escape as markup_escape
+from jinja2 import Environment, FileSystemBytecodeCache, \
+    FileSystemLoader, ModuleLoader
+from markupsafe import Markup, escape as markup_escape
 
-from redscript_docgen.parser import Class, Func, Field, Enum, Type
+from redscript_docgen.hierarchy import HierarchyIndex
+from redscript_docgen.pages import definition_page, page_href, redirects
+from redscript_docgen.parser import Type
+from redscript_docgen.store import CLASS_TYPES, FUNC_TYPES, FIELD_TYPES, ENUM_TYPES
 
 
 def is_class(definition):
-    return isinstance(definition, Class)
+    return isinstance(definition, CLASS_TYPES)
 
 
 def is_function(definition):
-    return isinstance(definition, Func)
+    return isinstance(definition, FUNC_TYPES)
 
 
 def is_field(definition):
-    return isinstance(definition, Field)
+    return isinstance(definition, FIELD_TYPES)
 
 
 def is_enum(definition):
-    return isinstance(definition, Enum)
+    return isinstance(definition, ENUM_TYPES)
 
 
 def type_name(type_def):
@@ -38,37 +42,125 @@ def type_name_unwrap(type_def):
     return type_def.name
 
 
-def make_link_filter(namespace_root):
-    @contextfilter
-    def link_filter(ctx, value):
-        if isinstance(value, Type):
-            inner_type = type_name_unwrap(value)
-            name = type_name(value)
-        else:
-            inner_type = value
-            name = value
+def link_target(namespace_root, base_uri, name, ext=".html"):
+    if name not in namespace_root:
+        return None
+
+    target = namespace_root[name]
+    target_path = page_href(base_uri, definition_page(namespace_root.pages, target), ext)
+    return f"{target_path}#{target.id}"
+
+
+def escape_rst(value):
+    return value.replace("\\", "\\\\").replace("<", "\\<").replace("`", "\\`")
 
-        if inner_type not in namespace_root:
-            return markup_escape(name)
 
-        target = namespace_root[inner_type]
-        target_path = target.file_path.parent.parts or ("global", )
-        base_uri = ctx.environment.globals["base_uri"]
-        target_path = os.path.join(base_uri, *target_path) + ".html"
-        mode = ctx.environment.globals["mode"]
-        if mode == "html":
-            result = f"""<a href="{target_path}#{target.id}">{markup_escape(name)}</a>"""
-            return result
+def escape_md(value):
+    for char in "\\`*[]<>":
+        value = value.replace(char, "\\" + char)
+    return value
+
+
+def format_link(mode, name, href):
+    if mode == "html":
+        if href is None:
+            return markup_escape(name)
+        return Markup(f"""<a href="{href}">{markup_escape(name)}</a>""")
+    if mode == "rst":
+        if href is None:
+            return name
+        return f"`{escape_rst(name)} <{href}>`__"
+    if mode == "md":
+        if href is None:
+            return escape_md(name)
+        return f"[{escape_md(name)}]({href})"
+
+
+def definition_types(definition):
+    for member in getattr(definition, "members", ()):
+        yield from definition_types(member)
+    for attribute in ("type", "return_type"):
+        value = getattr(definition, attribute, None)
+        if value is not None:
+            yield value
+    for param in getattr(definition, "parameters", ()):
+        yield param.type_
+
+
+class LinkTable:
+    # the link markup of every distinct (interned) type, built once per
+    # index so that the link filter is a dict lookup
+    def __init__(self, namespace_root, base_uri, mode):
+        self.namespace_root = namespace_root
+        self.base_uri = base_uri
+        self.mode = mode
+        self.ext = "." + mode
+        self.targets = {}
+        self.links = {}
+
+    def build(self):
+        self.targets.clear()
+        self.links.clear()
+        for definitions in self.namespace_root.forward_map.values():
+            for definition in definitions:
+                if getattr(definition, "base", None):
+                    self.lookup(definition.base)
+                for type_def in definition_types(definition):
+                    self.lookup(type_def)
+
+    def target(self, name):
+        try:
+            return self.targets[name]
+        except KeyError:
+            href = link_target(self.namespace_root, self.base_uri, name, self.ext)
+            self.targets[name] = href
+            return href
+
+    # returns (linked name, href, markup)
+    def lookup(self, value):
+        try:
+            return self.links[value]
+        except KeyError:
+            if isinstance(value, Type):
+                inner_type = type_name_unwrap(value)
+                name = type_name(value)
+            else:
+                inner_type = name = value
+            href = self.target(inner_type)
+            entry = self.links[value] = inner_type, href, format_link(self.mode, name, href)
+            return entry
+
+
+def make_link_filter(link_table, recorder=None):
+    def link_filter(value):
+        if not isinstance(value, (Type, str)):
+            return markup_escape(value)
+        inner_type, href, markup = link_table.lookup(value)
+        if recorder is not None:
+            recorder.record(inner_type, href)
+        return markup
 
     return link_filter
 
 
-def init_env(mode, base_uri, namespace):
+def template_loader(mode, compiled_path=None):
+    if compiled_path is not None:
+        return ModuleLoader(os.path.join(compiled_path, mode))
+    return FileSystemLoader(os.path.join("templates", mode))
+
+
+def init_env(mode, base_uri, namespace, recorder=None, cache_path=None, compiled_path=None):
+    bytecode_cache = None
+    if cache_path is not None:
+        os.makedirs(cache_path, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(os.fspath(cache_path))
     env = Environment(
-        loader=FileSystemLoader(os.path.join("templates", mode))
+        loader=template_loader(mode, compiled_path),
+        bytecode_cache=bytecode_cache,
     )
     mode_ext = "." + mode
-    env.filters["link"] = make_link_filter(namespace)
+    link_table = LinkTable(namespace, base_uri, mode)
+    env.filters["link"] = make_link_filter(link_table, recorder)
     env.filters["type_name"] = type_name
     env.filters["is_class"] = is_class
     env.filters["is_function"] = is_function
@@ -81,11 +173,21 @@ def init_env(mode, base_uri, namespace):
     env.globals["base_uri"] = base_uri
     env.globals["mode"] = mode
     env.globals["definitions_map"] = namespace
+    env.globals["link_table"] = link_table
+    env.globals["hierarchy"] = HierarchyIndex(namespace, link_table, recorder)
+    env.globals["page_href"] = lambda page: page_href(base_uri, page, mode_ext)
+    env.globals["redirects"] = lambda parts: redirects(parts, env.globals["page_href"])
     return env, mode_ext
 
 
+def build_indexes(env):
+    # called whenever the namespace changed, the hierarchy uses the links
+    env.globals["link_table"].build()
+    env.globals["hierarchy"].build()
+
+
 def definition_inheritance_tree(definition, namespace):
-    if not isinstance(definition, Class):
+    if not is_class(definition):
         return []
     base = definition.base
     bases = []
@@ -94,3 +196,16 @@ def definition_inheritance_tree(definition, namespace):
         parent = namespace[base]
         base = parent.base
     return bases
+
+
+def compile_templates(target, modes=("html", "rst", "md")):
+    # templates that fail to compile are skipped, as with the loader they
+    # would fail on first use
+    for mode in modes:
+        env, _ = init_env(mode, "", {})
+        env.compile_templates(os.path.join(target, mode), zip=None)
+
+
+if __name__ == '__main__':
+    import sys
+    compile_templates(sys.argv[1])
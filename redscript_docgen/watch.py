@@ -0,0 +1,119 @@
+import logging
+import os
+import time
+from pathlib import Path
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+log = logging.getLogger()
+
+
+def snapshot(directory):
+    result = {}
+    for path in directory.glob("**/*.script"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        result[path] = stat.st_mtime_ns, stat.st_size
+    return result
+
+
+class PollingWatcher:
+    def __init__(self, directory, interval=1.0):
+        self.directory = directory
+        self.interval = interval
+        self.state = snapshot(directory)
+
+    def __iter__(self):
+        while True:
+            time.sleep(self.interval)
+            state = snapshot(self.directory)
+            changed = {
+                path for path in state.keys() | self.state.keys()
+                if state.get(path) != self.state.get(path)
+            }
+            self.state = state
+            if changed:
+                yield changed
+
+
+class InotifyWatcher:
+    def __init__(self, directory, delay=0.1):
+        flags = inotify_simple.flags
+        self.mask = (flags.CLOSE_WRITE | flags.CREATE | flags.DELETE
+                     | flags.MOVED_FROM | flags.MOVED_TO)
+        self.delay = int(delay * 1000)
+        self.inotify = inotify_simple.INotify()
+        self.watches = {}
+        self.add_tree(directory)
+
+    def add_tree(self, directory):
+        for root, _, _ in os.walk(directory):
+            wd = self.inotify.add_watch(root, self.mask)
+            self.watches[wd] = Path(root)
+
+    def remove_tree(self, directory):
+        # a directory moved out of the tree would still be watched, the
+        # kernel only removes the watches of deleted ones
+        for wd, path in list(self.watches.items()):
+            if path == directory or directory in path.parents:
+                del self.watches[wd]
+                try:
+                    self.inotify.rm_watch(wd)
+                except OSError:
+                    pass
+
+    def __iter__(self):
+        flags = inotify_simple.flags
+        while True:
+            changed = set()
+            # read_delay collects the burst of events an editor save causes
+            for event in self.inotify.read(read_delay=self.delay):
+                if event.mask & flags.IGNORED:
+                    self.watches.pop(event.wd, None)
+                    continue
+                parent = self.watches.get(event.wd)
+                if parent is None or not event.name:
+                    continue
+                path = parent / event.name
+                if event.mask & flags.ISDIR:
+                    if event.mask & (flags.CREATE | flags.MOVED_TO):
+                        self.add_tree(path)
+                    elif event.mask & (flags.DELETE | flags.MOVED_FROM):
+                        self.remove_tree(path)
+                    changed.add(path)
+                elif path.suffix == ".script":
+                    changed.add(path)
+            if changed:
+                yield changed
+
+
+def make_watcher(directory, interval=1.0):
+    if inotify_simple is not None:
+        try:
+            return InotifyWatcher(directory)
+        except OSError as e:
+            log.warning("inotify unavailable, polling instead: %s", e)
+    return PollingWatcher(directory, interval)
+
+
+def watch(builder, interval=1.0):
+    watcher = make_watcher(builder.directory, interval)
+    log.info("watching %s for changes", builder.directory)
+    # the paths of a failed update are tried again with the next change
+    pending = set()
+    try:
+        for paths in watcher:
+            pending |= paths
+            try:
+                builder.update(pending)
+            except Exception:
+                log.exception("updating %s changed paths failed", len(pending))
+                continue
+            pending = set()
+    except KeyboardInterrupt:
+        pass
@@ -1,6 +1,14 @@
+{% set node = hierarchy[definition.name] -%}
 <div class="definition d-class" id="{{definition.id}}">
 <h3>Class <span class="d-name">{{ definition.name }}</span> {% if definition.base %}extends {{ definition.base | link }}{% endif %}</h3>
 <div class="d-origin">Defined in <span>`{{ definition.file_path.parts | join("/") }}`</span></div>
+{% if node.ancestors -%}
+<div class="d-ancestors">Inheritance: {% for name in node.ancestors %}{{ name | link }}{{ " &larr; " if not loop.last }}{% endfor %}</div>
+{% endif -%}
+{% if node.subclasses -%}
+<div class="d-subclasses">Subclasses: {% for name in node.subclasses %}{{ name | link }}{{ ", " if not loop.last }}{% endfor %}
+    {%- if node.descendants | length > node.subclasses | length %} ({{ node.descendants | length }} descendants){% endif %}</div>
+{% endif -%}
 
 <div class="d-body">
     <div class="d-fields ms-3">
@@ -14,6 +22,7 @@
                 id="{{member.id}}"
             >{{ member.name}}</a>: {{ member.type_ | link }}
         </code>
+        {%- if member.name in node.overrides %} <span class="d-override">overrides {{ node.overrides[member.name] | link }}</span>{% endif %}
     </div>r
 {% endfor %}
     </div>
@@ -31,7 +40,20 @@
             <var>{{ param.qualifiers | join(" ")}} {{ param.name }}:</var><span>{{ param.type_ | link }}{{ ", " if not loop.last else " " }}</span>
             {%- endfor -%}</span>) -&gt; {{ member.return_type | link }}
     </code>
+    {%- if member.name in node.overrides %} <span class="d-override">overrides {{ node.overrides[member.name] | link }}</span>{% endif %}
 {% endfor %}
     </div>
+{% if node.inherited %}
+    <div class="d-inherited ms-3">
+    <h4>Inherited members</h4>
+{% for owner, members in node.inherited -%}
+    <div class="d-inherited-from">From {{ owner | link }}:
+    {% for member, href in members -%}
+        {% if href %}<a class="d-name" href="{{ href }}">{{ member.name }}</a>{% else %}{{ member.name }}{% endif %}{{ ", " if not loop.last }}
+    {%- endfor %}
+    </div>
+{% endfor %}
+    </div>
+{% endif %}
 </div>
 </div>
@@ -8,10 +8,16 @@
 <body>
   <div class="container-fluid">
     <div class="row">
-        <nav id="sidebar" class="sticky-top col-4"></nav>
+        <nav id="sidebar" class="sticky-top col-4">
+            <input id="search" type="search" class="form-control my-2" placeholder="Search" autocomplete="off">
+            <ul id="search-results" class="list-unstyled"></ul>
+            <div id="nav"></div>
+        </nav>
         <main class="col-8">{% block body %}{% endblock %}</main>
     </div>
   </div>
 <script src="{{base_uri}}/script.js"></script>
+<script src="{{base_uri}}/search.js" data-base="{{base_uri}}"></script>
+<script src="{{base_uri}}/nav.js" data-base="{{base_uri}}"></script>
 </body>
 </html>
\ No newline at end of file
@@ -0,0 +1,59 @@
+// Sidebar navigation built from nav.json, which lists every page once, so
+// the tree is not repeated in each page.
+(function () {
+    "use strict";
+    var script = document.currentScript;
+    var base = script.dataset.base ? script.dataset.base + "/" : "";
+
+    function link(name, href) {
+        var element = document.createElement(href ? "a" : "span");
+        if (href) {
+            element.href = base + href;
+            if (location.href.split("#")[0] === element.href) {
+                element.className = "fw-bold";
+            }
+        }
+        element.textContent = name;
+        return element;
+    }
+
+    function tree(nodes) {
+        var list = document.createElement("ul");
+        list.className = "list-unstyled ms-2";
+        nodes.forEach(function (node) {
+            var item = document.createElement("li");
+            item.appendChild(link(node.name, node.href));
+            if (node.parts.length) {
+                var parts = document.createElement("ul");
+                parts.className = "list-inline ms-2";
+                node.parts.forEach(function (part) {
+                    var partItem = document.createElement("li");
+                    partItem.className = "list-inline-item";
+                    partItem.appendChild(link(part[0], part[1]));
+                    parts.appendChild(partItem);
+                });
+                item.appendChild(parts);
+            }
+            if (node.children.length) {
+                item.appendChild(tree(node.children));
+            }
+            list.appendChild(item);
+        });
+        return list;
+    }
+
+    document.addEventListener("DOMContentLoaded", function () {
+        var nav = document.getElementById("nav");
+        if (!nav) {
+            return;
+        }
+        fetch(base + "nav.json").then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.json();
+        }).then(function (loaded) {
+            nav.appendChild(tree(loaded.pages));
+        });
+    });
+})();
@@ -0,0 +1,139 @@
+// Client side search over the sharded index in search/: the manifest maps
+// term prefixes to shard files, only the shards a query needs are loaded.
+(function () {
+    "use strict";
+    var script = document.currentScript;
+    var base = script.dataset.base ? script.dataset.base + "/" : "";
+    var kinds = {c: "class", f: "func", v: "field", e: "enum"};
+    var maxShards = 8;
+    var maxResults = 50;
+    var manifest = null;
+    var shards = {};
+
+    function fetchJson(name) {
+        return fetch(base + "search/" + name).then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.json();
+        });
+    }
+
+    function loadShard(prefix) {
+        if (!shards[prefix]) {
+            shards[prefix] = fetchJson(manifest.shards[prefix]);
+        }
+        return shards[prefix];
+    }
+
+    // the longest prefix of the query that has a shard, and every shard
+    // for a longer prefix that starts with the query
+    function shardsFor(query) {
+        var longest = null;
+        var result = [];
+        Object.keys(manifest.shards).forEach(function (prefix) {
+            if (query.startsWith(prefix)) {
+                if (longest === null || prefix.length > longest.length) {
+                    longest = prefix;
+                }
+            } else if (prefix.startsWith(query)) {
+                result.push(prefix);
+            }
+        });
+        if (longest !== null) {
+            result.push(longest);
+        }
+        return result;
+    }
+
+    function rank(entry, query) {
+        var name = entry[0].toLowerCase();
+        if (name === query) {
+            return 0;
+        }
+        return name.startsWith(query) ? 1 : 2;
+    }
+
+    function search(query) {
+        var prefixes = shardsFor(query);
+        if (prefixes.length > maxShards) {
+            return Promise.resolve(null);
+        }
+        return Promise.all(prefixes.map(loadShard)).then(function (loaded) {
+            var seen = {};
+            var results = [];
+            loaded.forEach(function (shard) {
+                Object.keys(shard.terms).forEach(function (term) {
+                    if (!term.startsWith(query)) {
+                        return;
+                    }
+                    shard.terms[term].forEach(function (index) {
+                        var entry = shard.entries[index];
+                        if (!seen[entry[3]]) {
+                            seen[entry[3]] = true;
+                            results.push(entry);
+                        }
+                    });
+                });
+            });
+            results.sort(function (a, b) {
+                return rank(a, query) - rank(b, query)
+                    || a[0].length - b[0].length
+                    || (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0);
+            });
+            return results.slice(0, maxResults);
+        });
+    }
+
+    function show(list, results) {
+        list.textContent = "";
+        if (results === null) {
+            var hint = document.createElement("li");
+            hint.textContent = "Keep typing…";
+            list.appendChild(hint);
+            return;
+        }
+        results.forEach(function (entry) {
+            var item = document.createElement("li");
+            var link = document.createElement("a");
+            link.href = base + entry[3];
+            link.textContent = entry[2] ? entry[2] + "." + entry[0] : entry[0];
+            var kind = document.createElement("small");
+            kind.className = "text-muted";
+            kind.textContent = " " + kinds[entry[1]];
+            item.appendChild(link);
+            item.appendChild(kind);
+            list.appendChild(item);
+        });
+    }
+
+    document.addEventListener("DOMContentLoaded", function () {
+        var input = document.getElementById("search");
+        var list = document.getElementById("search-results");
+        if (!input || !list) {
+            return;
+        }
+        var pending = 0;
+        var timer = null;
+        input.addEventListener("input", function () {
+            clearTimeout(timer);
+            timer = setTimeout(function () {
+                var query = input.value.trim().toLowerCase();
+                var current = ++pending;
+                if (!query) {
+                    list.textContent = "";
+                    return;
+                }
+                var ready = manifest ? Promise.resolve() : fetchJson("manifest.json").then(
+                    function (loaded) { manifest = loaded; });
+                ready.then(function () {
+                    return search(query);
+                }).then(function (results) {
+                    if (current === pending) {
+                        show(list, results);
+                    }
+                });
+            }, 100);
+        });
+    });
+})();
@@ -0,0 +1,26 @@
+{% extends "layout.tpl" %}
+
+{% block title %}
+{{ namespace | join(":") }}
+{% endblock %}
+
+{% block body %}
+
+<h2>Pages</h2>
+<ul class="d-parts">
+{% for page, key, ids in parts -%}
+<li><a href="{{ page_href(page) }}">{{ key }}</a></li>
+{% endfor %}
+</ul>
+<script>
+(function () {
+    // anchors of this page moved to its parts
+    var redirects = {{ redirects(parts) | tojson }};
+    var id = decodeURIComponent(location.hash.slice(1));
+    if (Object.prototype.hasOwnProperty.call(redirects.ids, id)) {
+        location.replace(redirects.pages[redirects.ids[id]] + "#" + id);
+    }
+})();
+</script>
+
+{% endblock %}
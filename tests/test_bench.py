@@ -0,0 +1,45 @@
+import json
+
+from click.testing import CliRunner
+
+from redscript_docgen.bench import CorpusConfig, CorpusGenerator, cli, run_benchmark
+from redscript_docgen.parser import parse
+
+CONFIG = CorpusConfig(files=4, directories=2, classes=2, fields=3, methods=2, body_lines=3)
+
+
+def test_generator_is_deterministic():
+    a = CorpusGenerator(CONFIG).source(0)
+    b = CorpusGenerator(CONFIG).source(0)
+    assert a == b
+    assert CorpusGenerator(CorpusConfig(seed=1)).source(0) != CorpusGenerator(CONFIG).source(0)
+
+
+def test_generated_sources_parse_alike():
+    generator = CorpusGenerator(CONFIG)
+    source = generator.source(0)
+    peg = parse(source, "f0.script", "peg")
+    descent = parse(source, "f0.script", "descent")
+    assert repr(peg) == repr(descent)
+    assert [it.name for it in descent] == ["C0x0", "C0x1", "E0x0", "Global0x0", "Global0x1"]
+    assert len(descent[0].members) == CONFIG.fields + CONFIG.methods
+
+
+def test_run_benchmark(tmp_path):
+    CorpusGenerator(CONFIG).write(tmp_path / "corpus")
+    result = run_benchmark(tmp_path / "corpus", repeat=1)
+    assert set(result["phases"]) == {
+        "discover", "parse_cold", "parse_warm", "index", "render"}
+    assert result["corpus"]["files"] == 4
+    assert result["corpus"]["warm_cache_hits"] == 4
+    assert result["corpus"]["config"]["seed"] == 0
+
+
+def test_cli_writes_results(tmp_path):
+    runner = CliRunner()
+    corpus = str(tmp_path / "corpus")
+    output = tmp_path / "result.json"
+    assert runner.invoke(cli, ["generate", corpus, "--files", "2", "--body-lines", "1"]).exit_code == 0
+    result = runner.invoke(cli, ["run", corpus, "--repeat", "1", "-o", str(output)])
+    assert result.exit_code == 0, result.output
+    assert json.loads(output.read_text())["version"] == 1
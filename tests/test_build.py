@@ -0,0 +1,185 @@
+import json
+
+import pytest
+
+from redscript_docgen import build
+from redscript_docgen.build import Builder
+
+
+def make_builder(tmp_path):
+    source_path = tmp_path / "src"
+    (source_path / "a").mkdir(parents=True)
+    (source_path / "b").mkdir()
+    (source_path / "a" / "one.script").write_text("class One {}")
+    (source_path / "b" / "two.script").write_text(
+        "class Two extends One {}")
+    output_path = tmp_path / "out"
+    return source_path, Builder(source_path, output_path, "", "html", "descent")
+
+
+def test_build_and_rebuild(tmp_path):
+    source_path, builder = make_builder(tmp_path)
+    builder.build()
+    assert (tmp_path / "out" / "a.html").exists()
+    assert (tmp_path / "out" / "b.html").exists()
+    assert builder.render() == 0
+    builder.close()
+
+
+def test_update_renders_dependent_pages(tmp_path):
+    source_path, builder = make_builder(tmp_path)
+    builder.build()
+    (source_path / "a" / "one.script").write_text("class Zero {}\nclass One {}")
+    # b links to One, whose anchor moved
+    assert builder.update({source_path / "a" / "one.script"}) == 2
+
+
+def test_update_added_and_removed_files(tmp_path):
+    source_path, builder = make_builder(tmp_path)
+    builder.build()
+    (source_path / "c").mkdir()
+    (source_path / "c" / "three.script").write_text("class Three {}")
+    assert builder.update({source_path / "c"}) == 1
+    assert "Three" in builder.namespace_root
+
+    (source_path / "c" / "three.script").unlink()
+    (source_path / "c").rmdir()
+    builder.update({source_path / "c"})
+    assert "Three" not in builder.namespace_root
+    builder.close()
+
+
+def test_compact_build_matches(tmp_path):
+    source_path, builder = make_builder(tmp_path)
+    builder.build()
+    compact = Builder(source_path, tmp_path / "compact", "", "html", "descent", compact=True)
+    compact.build()
+    for name in ("a.html", "b.html"):
+        assert (tmp_path / "compact" / name).read_text() == (tmp_path / "out" / name).read_text()
+    for i in range(5):
+        (source_path / "a" / "one.script").write_text(f"class Zero{i} {{}}\nclass One {{}}")
+        compact.update({source_path / "a" / "one.script"})
+    assert "Zero4" in compact.namespace_root
+    assert "Zero3" not in compact.namespace_root
+    # dead definitions are dropped once they outnumber the live ones
+    assert compact.store.definitions <= 2 * 3
+    builder.close()
+    compact.close()
+
+
+def test_low_memory_build_matches(tmp_path):
+    source_path, builder = make_builder(tmp_path)
+    builder.build()
+    builder.close()
+    low = Builder(source_path, tmp_path / "low", "", "html", "descent", low_memory=True)
+    low.build()
+    for name in ("a.html", "b.html", "search/manifest.json"):
+        assert (tmp_path / "low" / name).read_text() == (tmp_path / "out" / name).read_text()
+    # only the symbols are kept after rendering
+    assert low.namespace_root.forward_map == {}
+    assert low.namespace_root["Two"].base == "One"
+    assert low.render() == 0
+    low.close()
+
+
+@pytest.mark.parametrize("batch", (1, 64))
+def test_prescan_build_matches(tmp_path, monkeypatch, batch):
+    monkeypatch.setattr(build, "PRESCAN_BATCH", batch)
+    source_path, builder = make_builder(tmp_path)
+    builder.build()
+    builder.close()
+    prescan = Builder(source_path, tmp_path / "prescan", "", "html", "descent", prescan=True)
+    prescan.build()
+    for name in ("a.html", "b.html"):
+        assert (tmp_path / "prescan" / name).read_text() == (tmp_path / "out" / name).read_text()
+    prescan.close()
+
+
+@pytest.mark.parametrize("prescan", (False, True))
+def test_low_memory_parses_failed_sources_once(tmp_path, caplog, prescan):
+    source_path, _ = make_builder(tmp_path)
+    (source_path / "a" / "bad.script").write_text("class Good {}\nclass Bad { let x }\n")
+    builder = Builder(source_path, tmp_path / "out", "", "html", "descent", prescan=prescan)
+    builder.build()
+    builder.close()
+    caplog.clear()
+    low = Builder(source_path, tmp_path / "low", "", "html", "descent", low_memory=True,
+                  prescan=prescan)
+    low.build()
+    assert len([it for it in caplog.records if "bad.script" in it.getMessage()]) == 1
+    assert (tmp_path / "low" / "a.html").read_text() == (tmp_path / "out" / "a.html").read_text()
+    low.close()
+
+
+def test_unchanged_pages_are_not_written(tmp_path):
+    source_path, builder = make_builder(tmp_path)
+    builder.build()
+    assert builder.page_stats == {"written": 2, "unchanged": 0, "deleted": 0}
+    mtime = (tmp_path / "out" / "a.html").stat().st_mtime_ns
+    builder.build(force=True)
+    assert builder.page_stats == {"written": 0, "unchanged": 2, "deleted": 0}
+    assert (tmp_path / "out" / "a.html").stat().st_mtime_ns == mtime
+    builder.close()
+
+
+def test_removed_namespace_page_is_deleted(tmp_path):
+    source_path, builder = make_builder(tmp_path)
+    (source_path / "c" / "d").mkdir(parents=True)
+    (source_path / "c" / "d" / "three.script").write_text("class Three {}")
+    builder.build()
+    assert (tmp_path / "out" / "c" / "d.html").exists()
+    (source_path / "c" / "d" / "three.script").unlink()
+    builder.update({source_path / "c" / "d" / "three.script"})
+    assert builder.page_stats["deleted"] == 1
+    assert not (tmp_path / "out" / "c").exists()
+    builder.close()
+
+
+def test_definitions_are_sorted_per_page(tmp_path):
+    source_path, builder = make_builder(tmp_path)
+    (source_path / "a" / "zero.script").write_text("func B() -> Void {}\nclass A {}")
+    (source_path / "a" / "one.script").write_text("class One {}\nfunc A() -> Void {}")
+    builder.build()
+    definitions = builder.namespace_root.forward_map["a", ]
+    assert [(it.name, it.file_path.name) for it in definitions] == \
+           [("A", "one.script"), ("B", "zero.script"), ("A", "zero.script"), ("One", "one.script")]
+    builder.close()
+
+
+def test_page_budget_splits_pages(tmp_path):
+    source_path, builder = make_builder(tmp_path)
+    (source_path / "a" / "one.script").write_text(
+        "class One {}\nclass Other {}\nclass Three {}")
+    builder.close()
+    builder = Builder(source_path, tmp_path / "out", "", "html", "descent", page_budget=2)
+    builder.build()
+    out = tmp_path / "out"
+    assert (out / "a.O.html").exists() and (out / "a.T.html").exists()
+    one = builder.namespace_root["One"]
+    assert f'href="a.O.html#{one.id}"' in (out / "b.html").read_text()
+    stub = (out / "a.html").read_text()
+    assert 'href="a.O.html"' in stub and f'"{one.id}": 0' in stub
+    nav = json.loads((out / "nav.json").read_text())
+    assert nav["pages"][0]["parts"] == [["O", "a.O.html"], ["T", "a.T.html"]]
+
+    (source_path / "a" / "one.script").write_text("class One {}")
+    builder.update({source_path / "a" / "one.script"})
+    assert builder.page_stats["deleted"] == 2
+    assert not (out / "a.O.html").exists()
+    assert f'href="a.html#{one.id}"' in (out / "b.html").read_text()
+    builder.close()
+
+
+def test_source_parsed_by_interrupted_run_is_rendered(tmp_path):
+    source_path, builder = make_builder(tmp_path)
+    builder.build()
+    builder.close()
+    (source_path / "a" / "one.script").write_text("class One {}\nclass Added {}")
+    # the run stops after parsing, the parse cache already has the change
+    interrupted = Builder(source_path, tmp_path / "out", "", "html", "descent")
+    interrupted.parse(interrupted.discover())
+    interrupted.close()
+    builder = Builder(source_path, tmp_path / "out", "", "html", "descent")
+    builder.build()
+    builder.close()
+    assert "Added" in (tmp_path / "out" / "a.html").read_text()
@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from redscript_docgen.cache import ParseCache, HIT, MISS, STALE, connections
+
+
+def make_source(tmp_path, text):
+    source = tmp_path / "src" / "a.script"
+    source.parent.mkdir(exist_ok=True)
+    source.write_text(text)
+    return source
+
+
+def test_cache_miss_then_hit(tmp_path):
+    source = make_source(tmp_path, "func a() -> b")
+    cache = ParseCache(tmp_path / "cache" / "parse.sqlite", "v1")
+    status, key, definitions, text = cache.load(source, Path("a.script"))
+    assert status == MISS
+    assert text == b"func a() -> b"
+    cache.store(Path("a.script"), key, ["a"])
+    cache.flush()
+
+    status, key, definitions, text = cache.load(source, Path("a.script"))
+    assert (status, key, definitions, text) == (HIT, None, ["a"], None)
+
+
+def test_cache_touched_source_is_hit(tmp_path):
+    source = make_source(tmp_path, "func a() -> b")
+    cache = ParseCache(tmp_path / "cache" / "parse.sqlite", "v1")
+    _, key, _, _ = cache.load(source, Path("a.script"))
+    cache.store(Path("a.script"), key, ["a"])
+    cache.flush()
+    os.utime(source, ns=(0, 0))
+
+    status, key, definitions, _ = cache.load(source, Path("a.script"))
+    assert (status, definitions) == (HIT, ["a"])
+    assert key.mtime_ns == 0
+
+
+def test_cache_changed_source_is_stale(tmp_path):
+    source = make_source(tmp_path, "func a() -> b")
+    cache = ParseCache(tmp_path / "cache" / "parse.sqlite", "v1")
+    _, key, _, _ = cache.load(source, Path("a.script"))
+    cache.store(Path("a.script"), key, ["a"])
+    cache.flush()
+    source.write_text("func b() -> c")
+    os.utime(source, ns=(0, 0))
+
+    status, key, definitions, text = cache.load(source, Path("a.script"))
+    assert (status, definitions, text) == (STALE, None, b"func b() -> c")
+
+
+def test_cache_version_change_is_stale(tmp_path):
+    source = make_source(tmp_path, "func a() -> b")
+    cache = ParseCache(tmp_path / "cache" / "parse.sqlite", "v1")
+    _, key, _, _ = cache.load(source, Path("a.script"))
+    cache.store(Path("a.script"), key, ["a"])
+    cache.flush()
+
+    cache = ParseCache(tmp_path / "cache" / "parse.sqlite", "v2")
+    status, _, definitions, _ = cache.load(source, Path("a.script"))
+    assert (status, definitions) == (STALE, None)
+
+
+def test_retain_drops_removed_sources_and_unused_spans(tmp_path):
+    source = make_source(tmp_path, "func a() -> b")
+    cache = ParseCache(tmp_path / "cache" / "parse.sqlite", "v1")
+    for name in ("a.script", "b.script"):
+        _, key, _, _ = cache.load(source, Path(name))
+        cache.store(Path(name), key, [name])
+    cache.store_span("s1", ["a"])
+    cache.store_span("s2", ["b"])
+    cache.store_span_files(Path("a.script"), ["s1"])
+    cache.store_span_files(Path("b.script"), ["s2"])
+    assert cache.retain(["a.script"]) == 1
+    assert cache.load(source, Path("a.script"))[0] == HIT
+    assert cache.load(source, Path("b.script"))[0] == MISS
+    assert cache.load_span("s1") == ["a"]
+    assert cache.load_span("s2") is None
+
+    cache.store_span_files(Path("a.script"), [])
+    cache.retain(["a.script"])
+    assert cache.load_span("s1") is None
+
+
+def test_close_closes_connections_of_every_thread(tmp_path):
+    source = make_source(tmp_path, "func a() -> b")
+    cache = ParseCache(tmp_path / "cache" / "parse.sqlite", "v1")
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda _: cache.load(source, Path("a.script")), range(16)))
+    assert sum(it[2] == cache.path for it in connections) > 1
+    cache.close()
+    assert not any(it[2] == cache.path for it in connections)
@@ -0,0 +1,97 @@
+import gzip
+import os
+
+from redscript_docgen.build import Builder
+from redscript_docgen.compress import Minifier, minify, sync_compressed
+
+PAGE = """<html>
+  <head>
+    <script>
+      var  x = 1;
+    </script>
+  </head>
+  <body>   <p>one   two</p>
+    <pre>  keep
+      this  </pre>
+  </body>
+</html>
+"""
+
+
+def test_minify():
+    assert minify(PAGE) == (
+        "<html>\n<head>\n<script>\n      var  x = 1;\n    </script>\n</head>\n"
+        "<body> <p>one two</p>\n<pre>  keep\n      this  </pre>\n</body>\n</html>\n")
+
+
+def test_minify_does_not_depend_on_blocks():
+    for size in (1, 2, 3, 7, 20):
+        minifier = Minifier()
+        blocks = [minifier.feed(PAGE[i:i + size]) for i in range(0, len(PAGE), size)]
+        assert "".join(blocks) + minifier.flush() == minify(PAGE)
+
+
+def test_minify_keeps_attribute_values():
+    html = '<a  title="a  b"\n   data-x=\'c  > d\'>x  y</a>'
+    assert minify(html) == '<a title="a  b"\ndata-x=\'c  > d\'>x y</a>'
+    minifier = Minifier()
+    blocks = [minifier.feed(html[i:i + 3]) for i in range(0, len(html), 3)]
+    assert "".join(blocks) + minifier.flush() == minify(html)
+
+
+def test_minify_keeps_comments():
+    html = "<p>a  b</p>  <!-- don't  > \"x\" -->  <p>c  d</p>"
+    assert minify(html) == "<p>a b</p> <!-- don't  > \"x\" --> <p>c d</p>"
+    for size in (1, 2, 3, 5):
+        minifier = Minifier()
+        blocks = [minifier.feed(html[i:i + size]) for i in range(0, len(html), size)]
+        assert "".join(blocks) + minifier.flush() == minify(html)
+
+
+def test_minify_streams_unterminated_raw_element():
+    minifier = Minifier()
+    out = [minifier.feed("<PRE class=x>")]
+    for _ in range(1000):
+        out.append(minifier.feed("a  b\n"))
+        assert len(minifier.carry) < 10
+    out.append(minifier.feed("</pre  >  c"))
+    assert "".join(out) + minifier.flush() == "<PRE class=x>" + "a  b\n" * 1000 + "</pre > c"
+
+
+def test_sync_compressed(tmp_path):
+    page = tmp_path / "a.html"
+    page.write_text(PAGE)
+    (tmp_path / "__cache__").mkdir()
+    (tmp_path / "__cache__" / "b.json").write_text("{}")
+    assert sync_compressed(tmp_path, True) == (1, 0)
+    assert gzip.decompress((tmp_path / "a.html.gz").read_bytes()).decode() == PAGE
+    assert sync_compressed(tmp_path, True) == (0, 0)
+
+    page.write_text("changed")
+    os.utime(page, ns=(0, (tmp_path / "a.html.gz").stat().st_mtime_ns + 1))
+    assert sync_compressed(tmp_path, True) == (1, 0)
+    os.utime(page, ns=(0, (tmp_path / "a.html.gz").stat().st_mtime_ns + 1))
+    # a changed page must not keep a sibling that is served instead of it
+    assert sync_compressed(tmp_path, False) == (0, 1)
+    page.unlink()
+    sync_compressed(tmp_path, True)
+    (tmp_path / "c.html.gz").write_bytes(b"")
+    assert sync_compressed(tmp_path, True) == (0, 1)
+    assert sorted(it.name for it in tmp_path.iterdir()) == ["__cache__"]
+
+
+def test_minified_build(tmp_path):
+    source_path = tmp_path / "src" / "a"
+    source_path.mkdir(parents=True)
+    (source_path / "one.script").write_text("class One {}")
+    builder = Builder(tmp_path / "src", tmp_path / "out", "", "html", "descent")
+    builder.build()
+    builder.close()
+    builder = Builder(tmp_path / "src", tmp_path / "min", "", "html", "descent",
+                      minify=True, precompress=True)
+    builder.build()
+    builder.close()
+    text = (tmp_path / "min" / "a.html").read_text()
+    assert text == minify((tmp_path / "out" / "a.html").read_text())
+    assert gzip.decompress((tmp_path / "min" / "a.html.gz").read_bytes()).decode() == text
+    assert (tmp_path / "min" / "search.js.gz").exists()
@@ -0,0 +1,102 @@
+import io
+
+import pytest
+
+from redscript_docgen import build
+from redscript_docgen.build import Builder
+from redscript_docgen.export import index_paths, read_binary, read_index, read_jsonl, \
+    source_lines
+
+SOURCE = """\
+@addMethod(Base)
+public native func Free(out a: array<Int32>, b: Float) -> Bool;
+
+public abstract class One extends Base {
+  @default(One, 1)
+  private let value: ref<Two>;
+
+  public final func Get() -> Int32 {}
+}
+
+struct Two {}
+
+enum Mode {
+  On = 1,
+  Off = 2
+}
+"""
+
+
+def build_index(tmp_path, **options):
+    source_path = tmp_path / "src"
+    (source_path / "a").mkdir(parents=True)
+    (source_path / "a" / "one.script").write_text(SOURCE)
+    builder = Builder(source_path, tmp_path / "out", "", "html", "descent",
+                      emit_index=tmp_path / "index" / "symbols", **options)
+    builder.build()
+    builder.close()
+    return tmp_path / "index" / "symbols"
+
+
+def test_index_records(tmp_path):
+    index = build_index(tmp_path)
+    records = list(read_index(index.with_suffix(".jsonl")))
+    assert [(it["kind"], it["name"], it["owner"], it["line"]) for it in records] == [
+        ("func", "Free", None, 1),
+        ("param", "a", "Free", 1),
+        ("param", "b", "Free", 1),
+        ("class", "One", None, 4),
+        ("field", "value", "One", 5),
+        ("func", "Get", "One", 8),
+        ("struct", "Two", None, 11),
+        ("enum", "Mode", None, 13),
+        ("item", "On", "Mode", 13),
+        ("item", "Off", "Mode", 13),
+    ]
+    assert records[0]["annotations"] == ["@addMethod(Base)"]
+    assert records[0]["qualifiers"] == ["public", "native"]
+    assert records[0]["type"] == "Bool"
+    assert records[1]["qualifiers"] == ["out"]
+    assert records[1]["type"] == "array<Int32>"
+    assert records[3]["base"] == "Base"
+    assert records[4]["type"] == "ref<Two>"
+    assert records[8]["value"] == "1"
+    assert {it["file"] for it in records} == {"a/one.script"}
+    assert list(read_index(index.with_suffix(".bin"))) == records
+
+
+def test_low_memory_index_matches(tmp_path):
+    index = build_index(tmp_path / "default")
+    low_memory = build_index(tmp_path / "low", low_memory=True)
+    for suffix in (".jsonl", ".bin"):
+        assert low_memory.with_suffix(suffix).read_bytes() == index.with_suffix(suffix).read_bytes()
+
+
+def test_readers_reject_other_versions():
+    with pytest.raises(ValueError):
+        list(read_jsonl(io.StringIO('{"version":2}\n')))
+    with pytest.raises(ValueError):
+        list(read_binary(io.BytesIO(b"RSDI\x02\x00")))
+
+
+def test_update_reads_only_changed_sources(tmp_path, monkeypatch):
+    index = build_index(tmp_path)
+    source_path = tmp_path / "src"
+    (source_path / "b").mkdir()
+    (source_path / "b" / "two.script").write_text("class Two {}")
+    builder = Builder(source_path, tmp_path / "out", "", "html", "descent", emit_index=index)
+    builder.build()
+    read = []
+    monkeypatch.setattr(build, "source_lines", lambda path: read.append(path) or source_lines(path))
+    (source_path / "b" / "two.script").write_text("\n\nclass Two {}")
+    builder.update({source_path / "b" / "two.script"})
+    builder.close()
+    assert read == [source_path / "b" / "two.script"]
+    records = list(read_index(index.with_suffix(".jsonl")))
+    assert (records[-1]["name"], records[-1]["line"]) == ("Two", 3)
+    assert records[0]["name"] == "Free"
+
+
+def test_index_paths_keep_dotted_names(tmp_path):
+    assert index_paths(tmp_path / "sym.v2") == (tmp_path / "sym.v2.jsonl", tmp_path / "sym.v2.bin")
+    assert index_paths(tmp_path / "index.json")[0].name == "index.json.jsonl"
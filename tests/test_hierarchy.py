@@ -0,0 +1,80 @@
+from pathlib import Path
+
+from redscript_docgen.build import Builder, Namespace
+from redscript_docgen.hierarchy import HierarchyIndex
+from redscript_docgen.incremental import LinkRecorder
+from redscript_docgen.parser import parse
+from redscript_docgen.template_env import LinkTable
+
+SOURCE = """
+class Base {
+    public let hp: Int32;
+    public func Tick() -> Void
+    public func Name() -> String
+}
+class Mid extends Base {
+    public func Tick() -> Void
+}
+class Leaf extends Mid {
+    public func Name() -> String
+}
+class Other extends Mid {}
+class Loose extends IScriptable {}
+"""
+
+
+def make_index(recorder=None):
+    namespace = Namespace("global")
+    for definition in parse(SOURCE, Path("game", "a.script"), "descent"):
+        namespace.add_definition(definition)
+    link_table = LinkTable(namespace, "base", "html")
+    index = HierarchyIndex(namespace, link_table, recorder)
+    index.build()
+    return namespace, index
+
+
+def test_ancestors_and_subclasses():
+    _, index = make_index()
+    assert index["Leaf"].ancestors == ("Mid", "Base")
+    assert index["Loose"].ancestors == ("IScriptable", )
+    assert index["Base"].subclasses == ("Mid", )
+    assert index["Base"].descendants == ("Leaf", "Mid", "Other")
+    assert index["Mid"].subclasses == ("Leaf", "Other")
+    assert index["Unknown"].ancestors == ()
+
+
+def test_inherited_members_and_overrides():
+    namespace, index = make_index()
+    node = index["Leaf"]
+    assert node.overrides == {"Name": "Base"}
+    assert [
+        (owner, [(member.name, href) for member, href in group])
+        for owner, group in node.inherited
+    ] == [
+        ("Mid", [("Tick", f"base/game.html#{namespace['Mid', 'Tick'].id}")]),
+        ("Base", [("hp", f"base/game.html#{namespace['Base', 'hp'].id}")]),
+    ]
+    assert index["Mid"].overrides == {"Tick": "Base"}
+
+
+def test_lookup_records_fingerprint():
+    recorder = LinkRecorder()
+    _, index = make_index(recorder)
+    recorder.start()
+    index["Leaf"]
+    index["Unknown"]
+    assert recorder.stop() == {"hierarchy:Leaf": index.fingerprint("Leaf")}
+    assert index.fingerprint("Leaf") != index.fingerprint("Other")
+
+
+def test_new_subclass_rerenders_base_page(tmp_path):
+    source_path = tmp_path / "src"
+    (source_path / "a").mkdir(parents=True)
+    (source_path / "a" / "one.script").write_text("class One {}")
+    builder = Builder(source_path, tmp_path / "out", "", "html", "descent")
+    builder.build()
+    (source_path / "b").mkdir()
+    (source_path / "b" / "two.script").write_text("class Two extends One {}")
+    assert builder.update({source_path / "b"}) == 2
+    assert "Subclasses" in (tmp_path / "out" / "a.html").read_text()
+    builder.close()
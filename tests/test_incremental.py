@@ -0,0 +1,79 @@
+import sqlite3
+
+from redscript_docgen.incremental import LinkRecorder, PageGraph
+
+
+def make_graph(tmp_path, stamp="v1"):
+    return PageGraph(tmp_path / "pages.sqlite", stamp)
+
+
+def store_page(tmp_path, links):
+    graph = make_graph(tmp_path)
+    recorder = LinkRecorder()
+    recorder.start()
+    for name, href in links.items():
+        recorder.record(name, href)
+    graph.update("a/b", ("a/b/x.script", ), recorder.stop(), None, ("d1", ))
+    graph.close()
+
+
+def test_unchanged_page_is_current(tmp_path):
+    store_page(tmp_path, {"A": "a.html#1", "B": None})
+    links = {"A": "a.html#1"}
+    assert make_graph(tmp_path).is_current(
+        "a/b", ("a/b/x.script", ), ("d1", ), links.get)
+
+
+def test_changed_source_is_not_current(tmp_path):
+    store_page(tmp_path, {})
+    graph = make_graph(tmp_path)
+    assert not graph.is_current(
+        "a/b", ("a/b/x.script", ), ("d2", ), {}.get)
+    assert not graph.is_current(
+        "a/b", ("a/b/x.script", "a/b/y.script"), ("d1", "d1"), {}.get)
+
+
+def test_changed_link_is_not_current(tmp_path):
+    store_page(tmp_path, {"A": "a.html#1", "B": None})
+    graph = make_graph(tmp_path)
+    assert not graph.is_current(
+        "a/b", ("a/b/x.script", ), ("d1", ), {"A": "a.html#2"}.get)
+    assert not graph.is_current(
+        "a/b", ("a/b/x.script", ), ("d1", ), {"A": "a.html#1", "B": "b.html#1"}.get)
+
+
+def test_stamp_change_is_not_current(tmp_path):
+    store_page(tmp_path, {})
+    assert not make_graph(tmp_path, "v2").is_current(
+        "a/b", ("a/b/x.script", ), ("d1", ), {}.get)
+
+
+def test_retain_removes_pages(tmp_path):
+    store_page(tmp_path, {})
+    graph = make_graph(tmp_path)
+    assert graph.retain(["c"]) == {"a/b"}
+    graph.close()
+    assert make_graph(tmp_path).nodes == {}
+
+
+def test_digest_is_stored(tmp_path):
+    graph = make_graph(tmp_path)
+    graph.update("a/b", ("a/b/x.script", ), {}, "d1")
+    graph.close()
+    graph = make_graph(tmp_path)
+    assert graph.digest("a/b") == "d1"
+    assert graph.digest("c") is None
+
+
+def test_graph_without_digest_column(tmp_path):
+    db = sqlite3.connect(str(tmp_path / "pages.sqlite"))
+    db.execute("CREATE TABLE pages (page TEXT PRIMARY KEY, stamp TEXT NOT NULL, "
+               "sources TEXT NOT NULL, links TEXT NOT NULL)")
+    db.execute("INSERT INTO pages VALUES ('a/b', 'v1', '[\"a/b/x.script\"]', '{}')")
+    db.commit()
+    db.close()
+    graph = make_graph(tmp_path)
+    assert graph.nodes["a/b"].digest is None
+    graph.update("a/b", ("a/b/x.script", ), {}, "d1")
+    graph.close()
+    assert make_graph(tmp_path).digest("a/b") == "d1"
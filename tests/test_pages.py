@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from redscript_docgen.pages import nav_tree, split_definitions, split_pages, subpage
+from redscript_docgen.parser import parse
+
+SOURCE = """
+class Alpha { let a: Int32; let b: Int32; }
+class Apple {}
+class Beta {}
+func Build() -> Void {}
+enum Color { Red = 0, Blue = 1 }
+"""
+
+
+def definitions():
+    return parse(SOURCE, Path("game", "a.script"), "descent")
+
+
+def test_split_definitions():
+    parts = split_definitions(definitions(), 3)
+    # A has 4 entries, so it is split by name
+    assert [(key, [it.name for it in part]) for key, part in parts] == [
+        ("Alpha", ["Alpha"]), ("Apple", ["Apple"]), ("B", ["Beta", "Build"]), ("C", ["Color"])]
+
+
+def test_split_names_differing_in_case():
+    source = "class Foo {}\nclass foo {}\nclass FOO {}\nclass Fa {}"
+    parts = split_definitions(parse(source, Path("game", "a.script"), "descent"), 1)
+    assert [key for key, _ in parts] == ["FOO", "Fa", "Foo-2", "foo-3"]
+    assert [part[0].name for _, part in parts] == ["FOO", "Fa", "Foo", "foo"]
+
+
+def test_split_pages():
+    page_map = {("game", ): definitions(), ("small", ): definitions()[:1]}
+    stubs, pages = split_pages(page_map, 4)
+    assert sorted(page_map) == [("game.A", ), ("game.B", ), ("game.C", ), ("small", )]
+    assert [(page, key) for page, key, _ in stubs["game", ]] == [
+        (("game.A", ), "A"), (("game.B", ), "B"), (("game.C", ), "C")]
+    alpha = page_map["game.A", ][0]
+    assert pages[alpha.id] == pages[alpha.members[0].id] == ("game.A", )
+    assert alpha.members[0].id in stubs["game", ][0][2]
+    assert subpage((), "A") == ("global.A", )
+
+
+def test_split_pages_avoid_directories():
+    page_map = {("game", ): definitions(), ("game.a", ): definitions()[:1]}
+    stubs, pages = split_pages(page_map, 4)
+    assert [page for page, _, _ in stubs["game", ]] == [("game.A-2", ), ("game.B", ), ("game.C", )]
+    assert [it.name for it in page_map["game.a", ]] == [definitions()[0].name]
+
+
+def test_nav_tree():
+    stubs = {("a", "b"): [(("a", "b.X"), "X", [])]}
+    tree = nav_tree([(), ("a", "b"), ("a", "c")], stubs, "/".join)
+    assert tree == [
+        {"name": "a", "href": None, "parts": [], "children": [
+            {"name": "b", "href": "a/b", "parts": [["X", "a/b.X"]], "children": []},
+            {"name": "c", "href": "a/c", "parts": [], "children": []},
+        ]},
+        {"name": "global", "href": "", "parts": [], "children": []},
+    ]
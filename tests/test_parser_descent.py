@@ -0,0 +1,76 @@
+import pytest
+
+from redscript_docgen.parser import parse
+from redscript_docgen.parser.descent import Parser, ParseError
+
+from test_parser_grammar import ANNOTATIONS, ANNOTATION_LISTS, CLASS_FIELDS, CLASSES, ENUMS, \
+    FUNC_SIGS, FUNCS, GRAMMAR_SOURCE, PARAMETERS
+
+
+@pytest.mark.parametrize("value, expected", (
+    ("type", "Type(type, ())"),
+    ("type<type>", "Type(type, (Type(type, ()),))"),
+    ("type<type<type>>", "Type(type, (Type(type, (Type(type, ()),)),))"),
+    ("type < type >", "Type(type, (Type(type, ()),))"),
+    ("type < type < type > >", "Type(type, (Type(type, (Type(type, ()),)),))"),
+    ("array<Int32; 5>", "Type(array, (Type(Int32, ()),))"),
+))
+def test_type_ok(value, expected):
+    assert repr(Parser(value).type_()) == expected
+
+
+@pytest.mark.parametrize("value", PARAMETERS)
+def test_parameters_ok(value):
+    assert Parser(value).parameters() is not None
+
+
+@pytest.mark.parametrize("value", (
+    *ANNOTATIONS,
+    """@attrib(tooltip, "closing ) paren")""",
+))
+def test_annotation_ok(value):
+    assert Parser(value).annotation() == value
+
+
+@pytest.mark.parametrize("source", (
+    *FUNC_SIGS,
+    *FUNCS,
+    *(value + "func name() -> type" for value in ANNOTATION_LISTS),
+    *(value + " func name() -> type" for value in ANNOTATIONS),
+    *CLASSES,
+    *("class t { " + value + " }" for value in CLASS_FIELDS),
+    *ENUMS,
+    GRAMMAR_SOURCE,
+    "func t(p: t, opt p: t) -> t { while 1 { print(foo) } }",
+    "class t {}",
+    "class Name { /* comment /* nested */ */ }",
+    "enum ident{One=1,Two=-2,}",
+    "public static native func Free(a: Int32) -> Bool;\nfunc Next() -> Int32;",
+    """public native class Declared {
+      public final native func Name() -> String;
+      public final native func Type() -> Int32; // trailing
+      private func Body() -> Void {}
+    }""",
+))
+def test_descent_matches_peg(source):
+    expected = parse(source, "test.script", "peg")
+    assert repr(parse(source, "test.script", "descent")) == repr(expected)
+
+
+@pytest.mark.parametrize("source", (
+    "func Name() {}",
+    "class {}",
+    "class Name { let x: type }",
+    "enum Name { One }",
+    "enum Name { One = 1.5 }",
+    "enum Name { One = 1f }",
+    "func Name() -> type { {}",
+    "/* unterminated",
+    "@annotation() class Name {}",
+    "@annotation() enum Name { One = 1 }",
+    "class Name { let x: typé; }",
+    "enum Name { One = \u0661 }",
+))
+def test_descent_error(source):
+    with pytest.raises(ParseError):
+        parse(source, "test.script", "descent")
@@ -145,7 +145,7 @@ def test_annotation_params_ok(value):
     assert tree is not None
 
 
-@pytest.mark.parametrize("value", (
+ANNOTATIONS = (
     "@annotation()",
     "@annotation( \n )",
     "@annotation(param)",
@@ -158,7 +158,10 @@ def test_annotation_params_ok(value):
     """@annotation("string value")""",
     """@attrib(customEditor, "TweakDBGroupInheritance;DeviceAreaAttack")""",
     """@default(AOEAreaSetup, -1.f)""",
-))
+)
+
+
+@pytest.mark.parametrize("value", ANNOTATIONS)
 def test_annotation_ok(value):
     test_grammar = Grammar(
         "start = annotation\n"
@@ -170,7 +173,7 @@ def test_annotation_ok(value):
     assert tree is not None
 
 
-@pytest.mark.parametrize("value", (
+ANNOTATION_LISTS = (
     "@one() @two() ",
     "@one()\t@two() ",
     "@one()\n@two() ",
@@ -179,7 +182,10 @@ def test_annotation_ok(value):
     """on npc. This is determined by RPG for balance reasons Negative values """
     """are interpreted as infinity. Set to -1.0f by default.") """
     """@default(AOEAreaSetup, -1.f) """,
-))
+)
+
+
+@pytest.mark.parametrize("value", ANNOTATION_LISTS)
 def test_annotationlist_ok(value):
     test_grammar = Grammar(
         "start = annotationlist\n"
@@ -191,13 +197,16 @@ def test_annotationlist_ok(value):
     assert tree is not None
 
 
-@pytest.mark.parametrize("value", (
+TYPES = (
     "type",
     "type<type>",
     "type<type<type>>",
     "type < type >",
     "type < type < type > >"
-))
+)
+
+
+@pytest.mark.parametrize("value", TYPES)
 def test_type_ok(value):
     test_grammar = Grammar(
         grammar.type_ + grammar.symbols + grammar.ident + grammar.ws)
@@ -263,7 +272,7 @@ def test_param_list_ok(value):
     assert tree is not None
 
 
-@pytest.mark.parametrize("value", (
+PARAMETERS = (
     "()",
     "( )",
     "(ident: type)",
@@ -272,7 +281,10 @@ def test_param_list_ok(value):
     "(ident: type<type>)",
     "(ident: type, ident: type<type>, ident:type<type>)",
     "(ident: type, out ident: type, opt ident:type, ident:type)",
-))
+)
+
+
+@pytest.mark.parametrize("value", PARAMETERS)
 def test_parameters_ok(value):
     test_grammar = Grammar(
         grammar.params
@@ -339,14 +351,17 @@ def test_enum_body_ok(value):
     assert tree is not None
 
 
-@pytest.mark.parametrize("value", (
+ENUMS = (
     "enum ident{}",
     "enum ident { }",
     "enum ident {One = 1}",
     "enum ident {One = 1,}",
     "enum ident {One = 1, Two = 2,}",
     "enum ident{One=1,Two=2,}"
-))
+)
+
+
+@pytest.mark.parametrize("value", ENUMS)
 def test_enum_ok(value):
     test_grammar = Grammar(
         "start=enum\n"
@@ -359,7 +374,7 @@ def test_enum_ok(value):
     assert tree is not None
 
 
-@pytest.mark.parametrize("value", (
+FUNC_SIGS = (
     "func Name_Of_Func01() -> type",
     "public func Name_Of_Func01(param: type) -> type",
     "public static func Name_Of_Func01(param: type, out param: ref<type>) -> type",
@@ -367,7 +382,10 @@ def test_enum_ok(value):
     "public static native cb func Name_Of_Func01(   ) -> void",
     "@annotation() func name() -> type",
     "@one() @two() public static native func name() -> type"
-))
+)
+
+
+@pytest.mark.parametrize("value", FUNC_SIGS)
 def test_func_sig_ok(value):
     test_grammar = Grammar(
         "start=func_sig\n"
@@ -384,13 +402,16 @@ def test_func_sig_ok(value):
     assert tree is not None
 
 
-@pytest.mark.parametrize("value", (
+FUNCS = (
     "func Name()->type{}",
     "func Name() -> type {}",
     "func Name()->type\n{}",
     "func Name()->type\n",
     "func Name()->type\n{}",
-))
+)
+
+
+@pytest.mark.parametrize("value", FUNCS)
 def test_func_ok(value):
     test_grammar = Grammar(
         "start=func\n"
@@ -430,7 +451,7 @@ def test_func_body_ok(value):
     assert tree is not None
 
 
-@pytest.mark.parametrize("value", (
+CLASS_FIELDS = (
     "let ident:type;",
     "let ident: type;",
     "let ident :type;",
@@ -446,7 +467,10 @@ def test_func_body_ok(value):
     "public edit let ident:type<type>;",
     "private edit let ident: type<type>;",
     "@annotation(type, 1) public let m_currentInterval: Int32;"
-))
+)
+
+
+@pytest.mark.parametrize("value", CLASS_FIELDS)
 def test_class_field_ok(value):
     test_grammar = Grammar(
         "start = class_field\n"
@@ -487,7 +511,7 @@ def test_class_body_ok(value):
     assert tree is not None
 
 
-@pytest.mark.parametrize("value", (
+CLASSES = (
     "public native class ClassName {}",
     "struct StructName{}",
     "class Name { //comment\n}",
@@ -507,7 +531,10 @@ def test_class_body_ok(value):
       @annotation(foo)
       public static func Dothing(ident: type) -> void {}
     }"""
-))
+)
+
+
+@pytest.mark.parametrize("value", CLASSES)
 def test_class_ok(value):
     test_grammar = Grammar(
         grammar.class_
@@ -524,9 +551,7 @@ def test_class_ok(value):
     assert tree is not None
 
 
-def test_grammar_ok():
-    tree = grammar.grammar.parse(
-"""
+GRAMMAR_SOURCE = """
 enum gameEActionStatus {
   STATUS_INVALID = 0,
   STATUS_BOUND = 1,
@@ -557,6 +582,10 @@ public native class WeaponEvolution_Record extends TweakDBRecord {
   public final native func Type() -> gamedataWeaponEvolution
 }
 public class PingCachedData extends IScriptable {}
- """)
+ """
+
+
+def test_grammar_ok():
+    tree = grammar.grammar.parse(GRAMMAR_SOURCE)
     assert tree is not None
 
@@ -0,0 +1,31 @@
+import gc
+import pickle
+
+from redscript_docgen.parser import Type
+
+
+def test_type_interned():
+    a = Type("ref", [Type("Entity")])
+    b = Type("ref", (Type("Entity"),))
+    assert a is b
+    assert a.arguments[0] is Type("Entity")
+    assert Type("ref") is not a
+    assert Type("ref") != a
+
+
+def test_type_hash_and_eq():
+    links = {Type("array", [Type("Int32")]): 1}
+    assert links[Type("array", [Type("Int32")])] == 1
+    assert Type("Int32") != "Int32"
+
+
+def test_type_pickle_reinterns():
+    a = Type("array", [Type("ref", [Type("Entity")])])
+    assert pickle.loads(pickle.dumps([a, a])) == [a, a]
+    assert pickle.loads(pickle.dumps(a)) is a
+
+
+def test_unused_types_are_released():
+    Type("Unused", [Type("Released")])
+    gc.collect()
+    assert ("Unused", (Type("Released"), )) not in Type.interned
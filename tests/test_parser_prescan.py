@@ -0,0 +1,89 @@
+from pathlib import Path
+
+from redscript_docgen.build import parse_files_prescan
+from redscript_docgen.cache import ParseCache, MISS, STALE
+from redscript_docgen.parser import parse
+from redscript_docgen.parser.prescan import rebase, split_declarations
+
+SOURCE = """// header
+@addMethod(A)
+public func F() -> Void {
+  if x { y(); }
+}
+
+class A extends B {
+  let x: Int32;
+  func G() -> String { return "}"; }
+}
+
+native func H(a: Int32) -> Bool;
+
+enum E { X = 0, Y = 1 }
+"""
+
+
+def spans(text):
+    return [text[start:end] for start, end in split_declarations(text)]
+
+
+def test_split_declarations():
+    parts = spans(SOURCE)
+    assert len(parts) == 4
+    assert parts[0].startswith("@addMethod(A)")
+    assert parts[1].startswith("class A")
+    assert parts[2].startswith("native func H")
+    assert parts[3].startswith("enum E")
+    assert "".join(parts) == SOURCE[SOURCE.index("@"):]
+
+
+def test_split_declarations_recovers_after_error():
+    parts = spans("class A {}\nclass ( broken\nfunc F() -> Void;\n")
+    assert [it.split()[:2] for it in parts] == [["class", "A"], ["class", "("], ["func", "F()"]]
+
+
+def test_rebase_matches_whole_file():
+    whole = parse(SOURCE, Path("a.script"), "descent")
+    definitions = []
+    for start, end in split_declarations(SOURCE):
+        definitions.extend(rebase(parse(SOURCE[start:end], None, "descent"), Path("a.script"), start))
+    assert [(it.name, it.line_pos, it.file_path) for it in definitions] == \
+           [(it.name, it.line_pos, it.file_path) for it in whole]
+    assert [it.line_pos for it in definitions[1].members] == \
+           [it.line_pos for it in whole[1].members]
+
+
+def parse_source(tmp_path, text):
+    source = tmp_path / "a.script"
+    source.write_text(text)
+    cache = ParseCache(tmp_path / "parse.sqlite", "v1")
+    result, = parse_files_prescan([(source, Path("a.script"))], cache, "descent")
+    if result.key is not None:
+        cache.store(result.rel_path, result.key, result.definitions)
+    cache.close()
+    return result
+
+
+def test_unchanged_declarations_come_from_the_span_cache(tmp_path, monkeypatch):
+    result = parse_source(tmp_path, SOURCE)
+    assert result.status == MISS
+    assert [it.name for it in result.definitions] == ["F", "A", "H", "E"]
+
+    parsed = []
+    import redscript_docgen.build
+    original = redscript_docgen.build.parse
+    monkeypatch.setattr(redscript_docgen.build, "parse",
+                        lambda text, *args: parsed.append(text) or original(text, *args))
+    result = parse_source(tmp_path, "class Z {}\n" + SOURCE)
+    assert result.status == STALE
+    assert [it.name for it in result.definitions] == ["Z", "F", "A", "H", "E"]
+    # comments between declarations belong to the one before
+    assert parsed == ["class Z {}\n// header\n"]
+    assert result.definitions[2].line_pos == SOURCE.index("class A") + len("class Z {}\n")
+
+
+def test_syntax_error_drops_only_its_declaration(tmp_path, caplog):
+    result = parse_source(tmp_path, "class A {}\nclass ( broken\nfunc F() -> Void;\n")
+    assert [it.name for it in result.definitions] == ["A", "F"]
+    # not cached as a whole file, so the error is reported on every build
+    assert result.key is None
+    assert "failed at line 2" in caplog.text
@@ -0,0 +1,60 @@
+import pytest
+
+from redscript_docgen.parser import parse
+from redscript_docgen.parser.scan import skip_block, skip_comment
+
+
+@pytest.mark.parametrize("value", (
+    "{}",
+    "{ }",
+    "{ any thing }",
+    """{ let a: type = func(); let b = obj.func("param") }""",
+    """{ while 1 { print(foo) } }""",
+    """{ print("}") }""",
+    """{ print("\\"}") }""",
+    "{ // }\n}",
+    "{ /* } */ }",
+    "{ /* /* } */ } */ }",
+))
+def test_skip_block_ok(value):
+    assert skip_block(value + " tail", 0) == len(value)
+
+
+@pytest.mark.parametrize("value", (
+    "",
+    "x {}",
+    "{",
+    "{ { }",
+    """{ print("}) }""",
+    "{ /* } }",
+))
+def test_skip_block_notok(value):
+    assert skip_block(value, 0) is None
+
+
+@pytest.mark.parametrize("value", (
+    "/**/",
+    "/* */",
+    "/*/**/*/",
+    "/* /*  /*   */  */ */",
+    "/* public func test(opt x: Int32) -> Void {} */",
+))
+def test_skip_comment_ok(value):
+    assert skip_comment(value + " */", 0) == len(value)
+
+
+@pytest.mark.parametrize("value", ("", "/", "/*", "/* /* */", "x /**/"))
+def test_skip_comment_notok(value):
+    assert skip_comment(value, 0) is None
+
+
+@pytest.mark.parametrize("parser", ("peg", "descent"))
+def test_func_body_braces_in_strings(parser):
+    result = parse(
+        """class t {
+          func a() -> t { print("}"); /* } */ }
+          func b() -> t { // }
+          }
+        }""",
+        "test.script", parser)
+    assert [it.name for it in result[0].members] == ["a", "b"]
@@ -1,5 +1,6 @@
 import pytest
-from redscript_docgen.parser import parse
+from redscript_docgen.parser import grammar, parse
+from redscript_docgen.parser.transform import Compiler, Visitor
 
 
 @pytest.mark.parametrize("source", (
@@ -36,3 +37,55 @@ func t() -> t {}
 ))
 def test_transform_annotationlist(source):
     assert parse(source) is not None
+
+
+COMPILER_SOURCE = r"""// comment
+@one(param, "param")
+public static func t(p: array<ref<t>>, opt q: t, out r: t) -> Void { /* } */ }
+
+native func u() -> t {}
+
+public abstract class C extends B {
+  @default(C, 1)
+  protected persistent let f: wref<t>;
+  /* comment */
+  final func g() -> t {}
+}
+
+struct S {}
+
+enum E {
+  A = -1,
+  B = 2,
+}
+"""
+
+
+def model_values(value):
+    if isinstance(value, (list, tuple)):
+        return [model_values(it) for it in value]
+    if hasattr(type(value), "__slots__"):
+        return type(value).__name__, {
+            name: model_values(getattr(value, name))
+            for name in type(value).__slots__ if not name.startswith("_")}
+    return value
+
+
+def test_compiler_matches_visitor():
+    tree = grammar.grammar.parse(COMPILER_SOURCE)
+    expected = Visitor("a.script").visit(tree)
+    actual = Compiler("a.script").compile(tree)
+    assert [it.name for it in actual] == ["t", "u", "C", "S", "E"]
+    assert model_values(actual) == model_values(expected)
+
+
+@pytest.mark.parametrize("source", ("", "// comment\n"))
+def test_compiler_empty_source(source):
+    # Visitor returns the bare parse node here
+    assert Compiler(None).compile(grammar.grammar.parse(source)) == []
+
+
+def test_compiler_empty_enum():
+    # Visitor fails on enums without items
+    enum, = Compiler(None).compile(grammar.grammar.parse("enum E {}"))
+    assert enum.members == []
@@ -0,0 +1,31 @@
+from redscript_docgen.build import Builder
+from redscript_docgen.parser import parse
+from redscript_docgen.profiling import Profiler, count_nodes
+
+
+def test_count_nodes():
+    definitions = parse(
+        "class A { let a: Int32; func F(a: Int32, b: Bool) -> Void }\nenum E { X = 0 }",
+        "a.script", "descent")
+    # class, field, method, two params, enum, enum item
+    assert count_nodes(definitions) == 7
+
+
+def test_profiled_build(tmp_path):
+    source_path = tmp_path / "src"
+    for name in ("a", "b"):
+        (source_path / name).mkdir(parents=True)
+        (source_path / name / "one.script").write_text("class One {}\nfunc F() -> Void")
+    profiler = Profiler(top=1, pstats_path=tmp_path / "pstats")
+    builder = Builder(source_path, tmp_path / "out", "", "html", "descent", profiler=profiler)
+    builder.build()
+    builder.close()
+    assert set(profiler.phases) == {"discover", "parse", "index", "render", "write", "compress"}
+    assert sorted(it[2] for it in profiler.files) == ["a/one.script", "b/one.script"]
+    assert all(nodes == 2 for _, nodes, _ in profiler.files)
+    assert sorted(page for _, page in profiler.pages) == ["a", "b"]
+    assert (tmp_path / "pstats" / "parse.pstats").exists()
+    report = profiler.report()
+    assert [it.split()[0] for it in report[1:7]] == [
+        "discover", "parse", "index", "render", "write", "compress"]
+    assert report[7] == "slowest 1 of 2 parsed files:"
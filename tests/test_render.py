@@ -0,0 +1,58 @@
+from redscript_docgen.build import Builder
+from redscript_docgen.render import PageFile, PageRenderer, PageWriter
+
+
+def test_page_writer_blocks(tmp_path):
+    writer = PageWriter(maxsize=2)
+    for name in ("a", "b"):
+        path = tmp_path / "out" / f"{name}.html"
+        for block in ("one", "two", "three"):
+            writer.write(path, block)
+        writer.end(path)
+    empty = tmp_path / "out" / "empty.html"
+    writer.end(empty)
+    writer.close()
+    assert (tmp_path / "out" / "a.html").read_text() == "onetwothree"
+    assert (tmp_path / "out" / "b.html").read_text() == "onetwothree"
+    assert empty.read_text() == ""
+    assert writer.results[empty][1]
+
+
+def test_page_file_skips_unchanged(tmp_path):
+    path = tmp_path / "out" / "a.html"
+    page = PageFile(path)
+    page.write("one")
+    digest, written = page.close()
+    assert written
+    mtime = path.stat().st_mtime_ns
+    page = PageFile(path)
+    page.write("one")
+    assert page.close(digest) == (digest, False)
+    # without a digest the page on disk is compared
+    page = PageFile(path)
+    page.write("one")
+    assert page.close() == (digest, False)
+    assert path.stat().st_mtime_ns == mtime
+    page = PageFile(path)
+    page.write("two")
+    assert page.close(digest)[1]
+    assert path.read_text() == "two"
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_render_to_flush_size(tmp_path):
+    source_path = tmp_path / "src" / "a"
+    source_path.mkdir(parents=True)
+    (source_path / "one.script").write_text(
+        "\n".join(f"func F{i}(a: Int32) -> Bool" for i in range(20)))
+    builder = Builder(tmp_path / "src", tmp_path / "out", "", "html", "descent")
+    builder.build()
+    renderer = PageRenderer(
+        builder.namespace_root, builder.env_options, builder.env, builder.recorder,
+        flush_size=100)
+    blocks = []
+    renderer.render_to(("a",), blocks.append)
+    assert "".join(blocks) == (tmp_path / "out" / "a.html").read_text()
+    assert len(blocks) > 2
+    assert all(len(it) >= 100 for it in blocks[:-1])
+    builder.close()
@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+
+from redscript_docgen import search
+from redscript_docgen.build import Builder, Namespace
+from redscript_docgen.parser import parse
+from redscript_docgen.search import build_search_index, name_terms, shard_terms
+
+
+def test_name_terms():
+    assert name_terms("GetHealthUI") == {"gethealthui", "get", "health", "ui"}
+    assert name_terms("m_value2") == {"m_value2", "value"}
+
+
+def test_shard_terms_splits_large_groups(monkeypatch):
+    monkeypatch.setattr(search, "MAX_SHARD_ENTRIES", 2)
+    terms = {"a": [0], "ab": [1], "abc": [2], "abd": [3], "b": [4]}
+    shards = dict(shard_terms(terms))
+    assert shards == {
+        "a": {"a": [0]},
+        "ab": {"ab": [1]},
+        "abc": {"abc": [2]},
+        "abd": {"abd": [3]},
+        "b": {"b": [4]},
+    }
+
+
+def test_build_search_index():
+    namespace = Namespace("global")
+    for definition in parse(
+            "class Player { let health: Int32; func GetHealth() -> Int32 }\n"
+            "enum Mode { A = 0 }",
+            Path("game", "player.script"), "descent"):
+        namespace.add_definition(definition)
+    manifest, shards = build_search_index(namespace.forward_map, lambda namespace: "game.html")
+    assert manifest["count"] == 4
+    shard = shards[manifest["shards"]["h"]]
+    found = {
+        tuple(shard["entries"][index][:3])
+        for term, ids in shard["terms"].items() if term.startswith("health")
+        for index in ids
+    }
+    assert found == {("health", "v", "Player"), ("GetHealth", "f", "Player")}
+    assert shards[manifest["shards"]["m"]]["entries"][0][:2] == ["Mode", "e"]
+
+
+def test_builder_writes_search_index(tmp_path):
+    source_path = tmp_path / "src" / "a"
+    source_path.mkdir(parents=True)
+    (source_path / "one.script").write_text("class One {}")
+    builder = Builder(tmp_path / "src", tmp_path / "out", "", "html", "descent")
+    builder.build()
+    builder.close()
+    manifest = json.loads((tmp_path / "out" / "search" / "manifest.json").read_text())
+    shard = json.loads((tmp_path / "out" / "search" / manifest["shards"]["o"]).read_text())
+    assert shard["entries"][0][3].startswith("a.html#")
+    assert (tmp_path / "out" / "search.js").exists()
+
+
+def test_no_search_index_for_other_modes(tmp_path):
+    (tmp_path / "src").mkdir()
+    builder = Builder(tmp_path / "src", tmp_path / "out", "", "md", "descent")
+    builder.write_search()
+    builder.close()
+    assert not (tmp_path / "out" / "search").exists()
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+from redscript_docgen.build import Builder
+from redscript_docgen.serve import CachedPage, DocServer, PageCache
+
+
+def make_server(tmp_path, check_interval=60.0):
+    source_path = tmp_path / "src"
+    (source_path / "a").mkdir(parents=True)
+    (source_path / "b").mkdir()
+    (source_path / "a" / "one.script").write_text("class One {}")
+    (source_path / "b" / "two.script").write_text("class Two extends One {}")
+    builder = Builder(source_path, tmp_path / "out", "", "html", "descent")
+    docs = DocServer(builder, check_interval=check_interval)
+    docs.load()
+    return source_path, docs
+
+
+def test_page_cache_evicts_least_recently_used():
+    cache = PageCache(10)
+    cache.put("a", CachedPage(b"1234", (), {}))
+    cache.put("b", CachedPage(b"1234", (), {}))
+    cache.get("a")
+    cache.put("c", CachedPage(b"1234", (), {}))
+    assert list(cache.pages) == ["a", "c"]
+    assert cache.size == 8
+    cache.put("d", CachedPage(b"12345678901", (), {}))
+    assert "d" not in cache.pages
+
+
+def test_served_page_matches_build(tmp_path):
+    source_path, docs = make_server(tmp_path)
+    built = Builder(source_path, tmp_path / "built", "", "html", "descent")
+    built.build()
+    status, headers, body = docs.get("b.html")
+    assert status == HTTPStatus.OK
+    assert body == (tmp_path / "built" / "b.html").read_bytes()
+    assert docs.get("") == (HTTPStatus.FOUND, {"Location": "/a.html"}, b"")
+    assert docs.get("search/manifest.json")[0] == HTTPStatus.OK
+    assert docs.get("__cache__/parse.sqlite")[0] == HTTPStatus.NOT_FOUND
+    assert docs.get("../src/a/one.script")[0] == HTTPStatus.NOT_FOUND
+    built.close()
+    docs.builder.close()
+
+
+def test_changed_source_drops_dependent_pages(tmp_path):
+    source_path, docs = make_server(tmp_path)
+    docs.get("a.html")
+    docs.get("b.html")
+    # One keeps its anchor, so the page of b stays cached
+    (source_path / "a" / "one.script").write_text("class One {}\nclass Zero {}")
+    assert b"Zero" in docs.get("a.html")[2]
+    assert set(docs.cache.pages) == {("a", ), ("b", )}
+
+    # One moves, which changes the link on the page of b
+    (source_path / "a" / "one.script").write_text("class Zero {}\n\nclass One {}")
+    docs.check_interval = 0
+    docs.get("search.js")
+    assert set(docs.cache.pages) == set()
+    docs.builder.close()
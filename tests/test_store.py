@@ -0,0 +1,59 @@
+import pickle
+from pathlib import Path
+
+from redscript_docgen.parser import parse, Type
+from redscript_docgen.store import DefinitionStore, ClassView, FuncView, EnumView
+from redscript_docgen.template_env import is_class, is_field, is_function, is_enum
+
+SOURCE = """
+public native class Entity extends Object {
+    @runtimeProperty("a") public let health: Float;
+    public func Hit(opt amount: Int32, source: ref<Entity>) -> Bool
+}
+enum Kind { A = 0, B = 1 }
+static func Spawn() -> ref<Entity>
+"""
+
+
+def make_views():
+    definitions = parse(SOURCE, Path("game", "entity.script"), "descent")
+    store = DefinitionStore()
+    return definitions, store.add_all(definitions)
+
+
+def test_views_match_definitions():
+    definitions, (class_, enum, func) = make_views()
+    assert isinstance(class_, ClassView) and is_class(class_)
+    assert isinstance(enum, EnumView) and is_enum(enum)
+    assert isinstance(func, FuncView) and is_function(func)
+
+    assert class_.name == "Entity"
+    assert class_.base == "Object"
+    assert class_.file_path == Path("game", "entity.script")
+    assert list(class_.qualifiers) == definitions[0].qualifiers
+    assert class_.id == definitions[0].id
+    field, method = class_.members
+    assert is_field(field) and is_function(method)
+    assert list(field.annotations) == definitions[0].members[0].annotations
+    assert field.type is Type("Float")
+    assert [(it.name, it.type_, list(it.qualifiers)) for it in method.parameters] == [
+        ("amount", Type("Int32"), ["opt"]),
+        ("source", Type("ref", [Type("Entity")]), [""]),
+    ]
+    assert [(it.name, it.value) for it in enum.members] == [("A", "0"), ("B", "1")]
+    assert func.return_type is Type("ref", [Type("Entity")])
+    assert func.line_pos == definitions[2].line_pos
+
+
+def test_store_interns_strings():
+    _, (class_, _, func) = make_views()
+    store = class_.store
+    assert store.strings.values.count("Entity") == 1
+    assert store.paths.values == [None, Path("game", "entity.script")]
+
+
+def test_views_pickle():
+    _, views = make_views()
+    class_, enum, func = pickle.loads(pickle.dumps(views))
+    assert class_.store is func.store
+    assert [it.name for it in class_.members] == ["health", "Hit"]
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+
+from redscript_docgen.build import Namespace
+from redscript_docgen.parser import parse, Type
+from redscript_docgen.template_env import LinkTable
+
+
+def make_namespace():
+    namespace = Namespace("global")
+    for definition in parse(
+            "class Entity {}\nfunc Spawn(a: ref<Entity>) -> Int32",
+            Path("game", "entity.script"), "descent"):
+        namespace.add_definition(definition)
+    return namespace
+
+
+@pytest.mark.parametrize("mode, expected", (
+    ("html", '<a href="base/game.html#{id}">ref&lt;Entity&gt;</a>'),
+    ("rst", "`ref\\<Entity> <base/game.rst#{id}>`__"),
+    ("md", "[ref\\<Entity\\>](base/game.md#{id})"),
+))
+def test_link_table_modes(mode, expected):
+    namespace = make_namespace()
+    table = LinkTable(namespace, "base", mode)
+    table.build()
+    inner_type, href, markup = table.lookup(Type("ref", [Type("Entity")]))
+    assert inner_type == "Entity"
+    assert href == f"base/game.{mode}#{namespace['Entity'].id}"
+    assert str(markup) == expected.format(id=namespace["Entity"].id)
+
+
+def test_link_table_unresolved():
+    table = LinkTable(make_namespace(), "base", "html")
+    table.build()
+    assert table.lookup(Type("array", [Type("Int32")]))[1:] == (None, "array&lt;Int32&gt;")
+    assert table.target("Int32") is None
+
+
+def test_link_table_build_collects_types():
+    table = LinkTable(make_namespace(), "base", "html")
+    table.build()
+    assert set(table.links) == {Type("ref", [Type("Entity")]), Type("Int32")}
@@ -0,0 +1,42 @@
+import pytest
+
+from redscript_docgen import watch
+
+
+class FailingBuilder:
+    def __init__(self, directory, failures):
+        self.directory = directory
+        self.failures = failures
+        self.updates = []
+
+    def update(self, paths):
+        self.updates.append(set(paths))
+        if len(self.updates) <= self.failures:
+            raise ValueError("broken source")
+
+
+def test_watch_continues_after_failed_update(tmp_path, monkeypatch):
+    changes = [{tmp_path / "a.script"}, {tmp_path / "b.script"}, {tmp_path / "c.script"}]
+    monkeypatch.setattr(watch, "make_watcher", lambda directory, interval: iter(changes))
+    builder = FailingBuilder(tmp_path, 1)
+    watch.watch(builder)
+    assert builder.updates == [
+        {tmp_path / "a.script"},
+        {tmp_path / "a.script", tmp_path / "b.script"},
+        {tmp_path / "c.script"},
+    ]
+
+
+def test_inotify_forgets_removed_directories(tmp_path):
+    pytest.importorskip("inotify_simple")
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "c").mkdir()
+    watcher = watch.InotifyWatcher(tmp_path, delay=0.01)
+    changes = iter(watcher)
+    (tmp_path / "a" / "b").rmdir()
+    (tmp_path / "a").rmdir()
+    (tmp_path / "c").rename(tmp_path.parent / (tmp_path.name + "-c"))
+    (tmp_path / "d.script").write_text("")
+    while tmp_path / "d.script" not in next(changes):
+        pass
+    assert list(watcher.watches.values()) == [tmp_path]